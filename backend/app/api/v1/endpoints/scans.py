@@ -11,6 +11,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, UploadFile, File
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, update
 from pydantic import BaseModel, Field
@@ -23,7 +24,7 @@ from app.core.supabase_client import get_supabase_client, is_supabase_configured
 from app.models.user import User
 from app.models.repository import Repository
 from app.models.scan import Scan, ScanStatus, ScanTrigger
-from app.models.secret import Secret, SecretType, RiskLevel, SecretStatus
+from app.models.secret import Secret, SecretType, RiskLevel, finding_rows, finding_upsert
 from app.scanner import scanner
 from app.api.v1.endpoints.subscription import check_can_run_scan, increment_scan_counter
 
@@ -351,26 +352,9 @@ async def trigger_initial_scan(
                     scan_result = scanner.scan_directory(Path(cloned_dir))
                     
                     # Save findings
-                    for finding in scan_result.findings:
-                        secret = Secret(
-                            finding_id=finding.finding_id,
-                            scan_id=scan.id,
-                            type=finding.type,
-                            file_path=finding.file_path,
-                            line_number=finding.line_number,
-                            column_start=finding.column_start,
-                            column_end=finding.column_end,
-                            secret_value_masked=finding.secret_masked,
-                            secret_hash=finding.secret_hash,
-                            code_snippet=finding.code_snippet,
-                            match_rule=finding.match_rule,
-                            risk_level=finding.severity,
-                            risk_score=finding.risk_score,
-                            entropy_score=finding.entropy_score,
-                            is_test_file=finding.is_test_file,
-                            status=SecretStatus.OPEN.value
-                        )
-                        db.add(secret)
+                    rows = finding_rows(scan_result.findings, scan.id)
+                    if rows:
+                        await db.execute(finding_upsert(), rows)
                     
                     # Update scan record
                     scan.status = ScanStatus.COMPLETED.value
@@ -473,26 +457,9 @@ async def run_scan_task(
             scan_result = scanner.scan_directory(Path(actual_scan_path))
             
             # Save findings to database
-            for finding in scan_result.findings:
-                secret = Secret(
-                    finding_id=finding.finding_id,
-                    scan_id=scan.id,
-                    type=finding.type,
-                    file_path=finding.file_path,
-                    line_number=finding.line_number,
-                    column_start=finding.column_start,
-                    column_end=finding.column_end,
-                    secret_value_masked=finding.secret_masked,
-                    secret_hash=finding.secret_hash,
-                    code_snippet=finding.code_snippet,
-                    match_rule=finding.match_rule,
-                    risk_level=finding.severity,
-                    risk_score=finding.risk_score,
-                    entropy_score=finding.entropy_score,
-                    is_test_file=finding.is_test_file,
-                    status=SecretStatus.OPEN.value
-                )
-                db.add(secret)
+            rows = finding_rows(scan_result.findings, scan.id)
+            if rows:
+                await db.execute(finding_upsert(), rows)
             
             # Update scan record
             scan.status = ScanStatus.COMPLETED.value
@@ -962,7 +929,9 @@ async def get_scan_findings(
     result = await db.execute(query)
     secrets = result.scalars().all()
     
-    return [s.to_dict() for s in secrets]
+    # to_dict already yields JSON-ready values; hand them straight to orjson
+    # instead of letting the List[dict] response model re-validate every row
+    return ORJSONResponse([s.to_dict() for s in secrets])
 
 
 @router.post("/{scan_id}/cancel")
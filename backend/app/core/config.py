@@ -31,6 +31,7 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./secret_sentry.db"
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_STATEMENT_CACHE_SIZE: int = 500  # asyncpg prepared statements per connection; 0 behind pgbouncer
     
     # Supabase (primary data store)
     SUPABASE_URL: Optional[str] = None
@@ -57,6 +58,7 @@ class Settings(BaseSettings):
     # Scanning
     SCAN_TIMEOUT: int = 3600  # 1 hour
     MAX_FILE_SIZE_SCAN: int = 10 * 1024 * 1024  # 10MB per file
+    SCAN_EXECUTOR: str = "process"  # "process" (one interpreter per worker) or "thread"
     EXCLUDED_DIRS: List[str] = [
         "node_modules", ".git", "__pycache__", "venv", 
         ".venv", "dist", "build", ".next", "coverage"
@@ -92,6 +94,7 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 60  # seconds
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per process) or "redis" (shared)
     
     class Config:
         env_file = ".env"
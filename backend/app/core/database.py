@@ -2,6 +2,13 @@
 Vault Sentry - Database Configuration
 """
 
+from operator import attrgetter, itemgetter
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type, Union
+
+from sqlalchemy import JSON, Enum as SQLEnum, TypeDecorator, event, inspect
+from sqlalchemy.dialects.postgresql import JSONB, insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from loguru import logger
@@ -22,8 +29,25 @@ if "sqlite" not in settings.DATABASE_URL:
         "pool_pre_ping": True
     })
 
+# asyncpg prepares every statement; keep the hot Secret/Scan queries' plans
+# cached per pooled connection (SQLAlchemy's compiled cache sits above this)
+if "asyncpg" in settings.DATABASE_URL:
+    engine_kwargs["connect_args"] = {
+        "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+
 engine = create_async_engine(settings.DATABASE_URL, **engine_kwargs)
 
+if "sqlite" in settings.DATABASE_URL:
+    # Child rows are removed by ON DELETE CASCADE rather than by the ORM,
+    # which SQLite only honours with foreign key enforcement switched on
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -39,6 +63,114 @@ class Base(DeclarativeBase):
     pass
 
 
+# Document column type: binary JSONB on PostgreSQL (no text re-parse on load,
+# indexable and filterable server-side), plain JSON everywhere else (SQLite)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+# INSERT construct with ON CONFLICT support for the configured backend; the
+# PostgreSQL and SQLite variants share the on_conflict_do_* API
+dialect_insert = sqlite_insert if "sqlite" in settings.DATABASE_URL else postgresql_insert
+
+
+class ValueEnum(TypeDecorator):
+    """
+    Enum column stored by member value and loaded back as the member.
+    
+    Loaded values are coerced with a bare dict lookup, in place of
+    SQLAlchemy's per-value Enum processing (two Python calls per value).
+    The drivers in use return enum columns as str, so there is no string
+    processor to chain.
+    """
+    
+    impl = SQLEnum
+    cache_ok = True
+    
+    def __init__(self, enum_cls: Type[Enum], **kw: Any):
+        super().__init__(enum_cls, values_callable=_enum_values, **kw)
+        self.enum_cls = enum_cls
+    
+    def result_processor(self, dialect, coltype):
+        lookup: Dict[Optional[str], Optional[Enum]] = dict(self.enum_cls._value2member_map_)
+        lookup[None] = None
+        return lookup.__getitem__
+
+
+def _enum_values(enum_cls: Type[Enum]) -> list:
+    return [member.value for member in enum_cls]
+
+
+def enum_value(enum_cls: Type[Enum], key: str, value: Any) -> Optional[str]:
+    """
+    Validate a value for a String column restricted to an Enum's values.
+    
+    Used from @validates hooks in place of a database ENUM/CHECK type, so
+    loads return plain strings without per-row enum coercion.
+    
+    Args:
+        enum_cls: Enum whose values are allowed
+        key: Column name, for the error message
+        value: Enum member or raw value being assigned
+        
+    Returns:
+        The plain string value to store
+    """
+    if value is None:
+        return None
+    if value not in enum_cls._value2member_map_:
+        raise ValueError(f"Invalid {key}: {value!r}")
+    return value.value if isinstance(value, Enum) else value
+
+
+def row_serializer(
+    model: Type[Base],
+    fields: Sequence[Union[str, Tuple[str, str]]],
+    datetimes: Sequence[str] = ()
+) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Build a to_dict function for a model from a fixed field list.
+    
+    Loaded column values are read straight from the instance __dict__ in
+    one itemgetter call, skipping the per-attribute ORM descriptors; other
+    attributes (hybrids, properties) go through getattr. Instances with an
+    expired or unloaded column fall back to plain attribute access. Only
+    the datetime fields are converted with isoformat().
+    
+    Args:
+        model: Mapped class the function serializes
+        fields: Attribute names, or (key, attribute) pairs where the output
+            key differs from the attribute name
+        datetimes: Attribute names to ISO-format when set
+        
+    Returns:
+        Function mapping a model instance to a dictionary
+    """
+    pairs = [(f, f) if isinstance(f, str) else f for f in fields]
+    keys = tuple(key for key, _ in pairs)
+    attrs = [attr for _, attr in pairs]
+    getter = attrgetter(*attrs)
+    columns = set(inspect(model).columns.keys())
+    # Non-column slots read a placeholder key that every instance has and
+    # are overwritten from derived_slots
+    state_getter = itemgetter(*(attr if attr in columns else "_sa_instance_state" for attr in attrs))
+    derived_slots = tuple((i, attrgetter(attr)) for i, attr in enumerate(attrs) if attr not in columns)
+    datetime_slots = tuple(i for i, attr in enumerate(attrs) if attr in datetimes)
+    
+    def to_dict(obj: Any) -> Dict[str, Any]:
+        try:
+            values = list(state_getter(obj.__dict__))
+            for i, get in derived_slots:
+                values[i] = get(obj)
+        except KeyError:
+            values = list(getter(obj))
+        for i in datetime_slots:
+            value = values[i]
+            if value is not None:
+                values[i] = value.isoformat()
+        return dict(zip(keys, values))
+    
+    return to_dict
+
+
 async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
@@ -517,13 +517,13 @@ class PolicyEngine:
                         from app.integrations.slack_integration import SlackIntegration
                         slack = SlackIntegration()
                         if slack.is_configured:
-                            await slack.send_alert(
+                            await slack.queue_alert(
                                 finding,
                                 severity=actions.get('highest_severity', 'medium')
                             )
                             results['executed'].append({
                                 'action': f'notify_{channel}',
-                                'status': 'sent'
+                                'status': 'queued'
                             })
                     elif channel == 'email':
                         # Email notification would go here
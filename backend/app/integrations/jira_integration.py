@@ -5,11 +5,13 @@ Issue creation and tracking for discovered secrets.
 
 import os
 import json
+import asyncio
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from enum import Enum
 from loguru import logger
+from tenacity import retry, retry_if_result, stop_after_attempt, wait_exponential_jitter
 import base64
 
 try:
@@ -19,6 +21,35 @@ except ImportError:
     HTTPX_AVAILABLE = False
 
 
+# Jira status codes worth retrying (rate limiting and transient gateway errors)
+_RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Maximum issues accepted by Jira's bulk create endpoint
+_BULK_BATCH_SIZE = 50
+
+# Shared HTTP client so every JiraIntegration reuses one connection pool
+_http_client: Optional["httpx.AsyncClient"] = None
+
+
+def _get_http_client() -> "httpx.AsyncClient":
+    """Get the shared httpx client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            timeout=30.0
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (called on application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 class JiraPriority(str, Enum):
     """Jira priority levels"""
     HIGHEST = "1"
@@ -49,6 +80,25 @@ class JiraIssue:
     custom_fields: Optional[Dict[str, Any]] = None
 
 
+# Map Vault Sentry severity to Jira priority
+_PRIORITY_MAP: Dict[str, JiraPriority] = {
+    'critical': JiraPriority.HIGHEST,
+    'high': JiraPriority.HIGH,
+    'medium': JiraPriority.MEDIUM,
+    'low': JiraPriority.LOW,
+}
+
+# Map Jira status name to secret status value (see app.models.secret.SecretStatus)
+_STATUS_MAP: Dict[str, str] = {
+    'done': 'resolved',
+    'closed': 'resolved',
+    'resolved': 'resolved',
+    'in progress': 'in_progress',
+    'to do': 'open',
+    'open': 'open',
+}
+
+
 class JiraIntegration:
     """
     Jira integration for Vault Sentry.
@@ -78,6 +128,8 @@ class JiraIntegration:
         else:
             self._auth_header = None
         
+        self._is_configured = bool(self.base_url and self._auth_header)
+        
         if not HTTPX_AVAILABLE:
             self.logger.warning("httpx not installed. HTTP functionality limited.")
         
@@ -87,8 +139,18 @@ class JiraIntegration:
     @property
     def is_configured(self) -> bool:
         """Check if Jira is properly configured"""
-        return bool(self.base_url and self._auth_header)
+        return self._is_configured
+    
+    async def aclose(self):
+        """Release pooled HTTP connections"""
+        await close_http_client()
     
+    @retry(
+        retry=retry_if_result(lambda r: r.get('status_code') in _RETRYABLE_STATUS_CODES),
+        wait=wait_exponential_jitter(initial=0.5, max=8),
+        stop=stop_after_attempt(4),
+        retry_error_callback=lambda state: state.outcome.result(),
+    )
     async def _request(
         self,
         method: str,
@@ -102,18 +164,18 @@ class JiraIntegration:
         
         url = f"{self.base_url}/rest/api/3/{endpoint}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                headers={
-                    'Authorization': self._auth_header,
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json',
-                }
-            )
+        client = _get_http_client()
+        response = await client.request(
+            method=method,
+            url=url,
+            json=data,
+            params=params,
+            headers={
+                'Authorization': self._auth_header,
+                'Content-Type': 'application/json',
+                'Accept': 'application/json',
+            }
+        )
         
         if response.status_code >= 400:
             self.logger.error(f"Jira API error: {response.status_code} - {response.text}")
@@ -126,20 +188,8 @@ class JiraIntegration:
             return response.json()
         return {'ok': True}
     
-    async def create_issue(
-        self,
-        issue: JiraIssue
-    ) -> Dict[str, Any]:
-        """
-        Create a Jira issue.
-        
-        Args:
-            issue: JiraIssue with issue details
-            
-        Returns:
-            Created issue details including key and URL
-        """
-        # Build issue payload
+    def _build_issue_fields(self, issue: JiraIssue) -> Dict[str, Any]:
+        """Build the Jira fields payload for an issue"""
         fields = {
             'project': {'key': issue.project_key or self.project_key},
             'summary': issue.summary,
@@ -171,6 +221,23 @@ class JiraIntegration:
         if issue.custom_fields:
             fields.update(issue.custom_fields)
         
+        return fields
+    
+    async def create_issue(
+        self,
+        issue: JiraIssue
+    ) -> Dict[str, Any]:
+        """
+        Create a Jira issue.
+        
+        Args:
+            issue: JiraIssue with issue details
+            
+        Returns:
+            Created issue details including key and URL
+        """
+        fields = self._build_issue_fields(issue)
+        
         result = await self._request('POST', 'issue', data={'fields': fields})
         
         if 'key' in result:
@@ -179,10 +246,39 @@ class JiraIntegration:
         
         return result
     
+    async def create_issues_bulk(
+        self,
+        issues: List[JiraIssue]
+    ) -> Dict[str, Any]:
+        """
+        Create several Jira issues in a single request.
+        
+        Args:
+            issues: Issues to create (Jira accepts at most 50 per call)
+            
+        Returns:
+            Bulk creation result with 'issues' (created, in request order)
+            and 'errors' (each with its 'failedElementNumber')
+        """
+        result = await self._request(
+            'POST',
+            'issue/bulk',
+            data={'issueUpdates': [{'fields': self._build_issue_fields(i)} for i in issues]}
+        )
+        
+        for created in result.get('issues', []):
+            created['url'] = f"{self.base_url}/browse/{created['key']}"
+        
+        if result.get('issues'):
+            self.logger.info(f"Created {len(result['issues'])} Jira issues in bulk")
+        
+        return result
+    
     async def create_secret_issue(
         self,
         finding: Dict[str, Any],
-        severity: str = 'high'
+        severity: str = 'high',
+        now: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Create a Jira issue for a secret finding.
@@ -190,24 +286,44 @@ class JiraIntegration:
         Args:
             finding: Secret finding details
             severity: Alert severity (critical, high, medium, low)
+            now: Detection timestamp (defaults to current UTC time)
             
         Returns:
             Created issue details
         """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        
+        issue = self._build_secret_issue(finding, severity, now)
+        
+        result = await self.create_issue(issue)
+        
+        # Record issue link in database
+        if 'key' in result:
+            await self._link_issue_to_secret(
+                finding.get('id'),
+                result['key'],
+                result.get('url', ''),
+                now
+            )
+        
+        return result
+    
+    def _build_secret_issue(
+        self,
+        finding: Dict[str, Any],
+        severity: str,
+        now: datetime
+    ) -> JiraIssue:
+        """Build the Jira issue for a secret finding"""
         # Map severity to Jira priority
-        priority_map = {
-            'critical': JiraPriority.HIGHEST,
-            'high': JiraPriority.HIGH,
-            'medium': JiraPriority.MEDIUM,
-            'low': JiraPriority.LOW,
-        }
-        priority = priority_map.get(severity.lower(), JiraPriority.MEDIUM)
+        priority = _PRIORITY_MAP.get(severity.lower(), JiraPriority.MEDIUM)
         
         # Build summary
         summary = f"[Vault Sentry] {finding.get('secret_type', 'Secret')} found in {finding.get('repository', 'repository')}"
         
         # Build description
-        description = self._build_issue_description(finding, severity)
+        description = self._build_issue_description(finding, severity, now)
         
         # Labels
         labels = [
@@ -217,7 +333,7 @@ class JiraIntegration:
             f'severity-{severity.lower()}'
         ]
         
-        issue = JiraIssue(
+        return JiraIssue(
             project_key=self.project_key,
             summary=summary,
             description=description,
@@ -225,23 +341,12 @@ class JiraIntegration:
             priority=priority,
             labels=labels
         )
-        
-        result = await self.create_issue(issue)
-        
-        # Record issue link in database
-        if 'key' in result:
-            await self._link_issue_to_secret(
-                finding.get('id'),
-                result['key'],
-                result.get('url', '')
-            )
-        
-        return result
     
     def _build_issue_description(
         self,
         finding: Dict[str, Any],
-        severity: str
+        severity: str,
+        now: datetime
     ) -> str:
         """Build formatted issue description"""
         lines = [
@@ -262,7 +367,7 @@ class JiraIntegration:
             finding.get('context', '(No context available)'),
             f"```",
             "",
-            "*Detected:* " + datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC'),
+            "*Detected:* " + now.strftime('%Y-%m-%d %H:%M:%S UTC'),
             "",
             "*Remediation Steps:*",
             "1. Verify if this is a true positive",
@@ -280,7 +385,8 @@ class JiraIntegration:
         self,
         secret_id: int,
         issue_key: str,
-        issue_url: str
+        issue_url: str,
+        now: datetime
     ):
         """Link Jira issue to secret in database"""
         if not secret_id:
@@ -297,7 +403,7 @@ class JiraIntegration:
                 metadata['jira'] = {
                     'issue_key': issue_key,
                     'issue_url': issue_url,
-                    'created_at': datetime.now(timezone.utc).isoformat()
+                    'created_at': now.isoformat()
                 }
                 secret.meta_data = metadata
                 db.commit()
@@ -438,23 +544,14 @@ class JiraIntegration:
         from app.models.secret import Secret, SecretStatus
         
         # Map Jira status to secret status
-        status_map = {
-            'done': SecretStatus.RESOLVED,
-            'closed': SecretStatus.RESOLVED,
-            'resolved': SecretStatus.RESOLVED,
-            'in progress': SecretStatus.ACKNOWLEDGED,
-            'to do': SecretStatus.OPEN,
-            'open': SecretStatus.OPEN,
-        }
-        
-        new_status = status_map.get(status.lower())
+        new_status = _STATUS_MAP.get(status.lower())
         
         if new_status:
             db = SessionLocal()
             try:
                 secret = db.query(Secret).filter(Secret.id == secret_id).first()
                 if secret:
-                    secret.status = new_status.value
+                    secret.status = new_status
                     if new_status == SecretStatus.RESOLVED:
                         secret.resolved_at = datetime.now(timezone.utc)
                         secret.resolution_notes = f"Resolved via Jira {issue_key}"
@@ -463,7 +560,7 @@ class JiraIntegration:
                     return {
                         'ok': True,
                         'secret_id': secret_id,
-                        'new_status': new_status.value,
+                        'new_status': new_status,
                         'jira_status': status
                     }
             finally:
@@ -557,21 +654,57 @@ Secret auto-rotation completed:
             'failed': []
         }
         
-        for finding in findings:
-            severity = finding.get('severity', 'medium')
-            result = await self.create_secret_issue(finding, severity)
+        now = datetime.now(timezone.utc)
+        
+        for start in range(0, len(findings), _BULK_BATCH_SIZE):
+            batch = findings[start:start + _BULK_BATCH_SIZE]
+            issues = [
+                self._build_secret_issue(f, f.get('severity', 'medium'), now)
+                for f in batch
+            ]
+            
+            bulk = await self.create_issues_bulk(issues)
             
-            if 'key' in result:
-                results['created'].append({
-                    'finding_id': finding.get('id'),
-                    'issue_key': result['key'],
-                    'issue_url': result.get('url', '')
-                })
+            if 'error' in bulk:
+                # Bulk endpoint rejected; fall back to individual requests
+                self.logger.warning(f"Jira bulk create failed, falling back to single issues: {bulk['error']}")
+                batch_results = await asyncio.gather(*[
+                    self.create_secret_issue(f, f.get('severity', 'medium'), now=now)
+                    for f in batch
+                ])
             else:
-                results['failed'].append({
-                    'finding_id': finding.get('id'),
-                    'error': result.get('error', 'Unknown error')
-                })
+                errors = {
+                    e.get('failedElementNumber'): e
+                    for e in bulk.get('errors', [])
+                }
+                created = iter(bulk.get('issues', []))
+                batch_results = []
+                for index, finding in enumerate(batch):
+                    if index in errors:
+                        batch_results.append({'error': str(errors[index].get('elementErrors', 'Unknown error'))})
+                        continue
+                    result = next(created, {'error': 'Unknown error'})
+                    if 'key' in result:
+                        await self._link_issue_to_secret(
+                            finding.get('id'),
+                            result['key'],
+                            result['url'],
+                            now
+                        )
+                    batch_results.append(result)
+            
+            for finding, result in zip(batch, batch_results):
+                if 'key' in result:
+                    results['created'].append({
+                        'finding_id': finding.get('id'),
+                        'issue_key': result['key'],
+                        'issue_url': result.get('url', '')
+                    })
+                else:
+                    results['failed'].append({
+                        'finding_id': finding.get('id'),
+                        'error': result.get('error', 'Unknown error')
+                    })
         
         return results
     
@@ -5,14 +5,20 @@ Webhook notifications and interactive messages for Slack.
 
 import os
 import json
+import asyncio
 import hashlib
 import hmac
 import time
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 from loguru import logger
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.secret import Secret, SecretStatus
 
 try:
     import httpx
@@ -20,6 +26,329 @@ try:
 except ImportError:
     HTTPX_AVAILABLE = False
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(payload: Any) -> bytes:
+    """Serialize a payload to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Shared HTTP session/client so alert bursts reuse pooled keep-alive connections.
+# aiohttp is preferred for outbound POST fan-out; httpx is the fallback.
+_aiohttp_session: Optional["aiohttp.ClientSession"] = None
+_http_client: Optional["httpx.AsyncClient"] = None
+
+
+def _get_aiohttp_session() -> "aiohttp.ClientSession":
+    """Get the shared aiohttp session, creating it on first use"""
+    global _aiohttp_session
+    if _aiohttp_session is None or _aiohttp_session.closed:
+        _aiohttp_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10.0)
+        )
+    return _aiohttp_session
+
+
+def _get_http_client() -> "httpx.AsyncClient":
+    """Get the shared httpx client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=10.0
+        )
+    return _http_client
+
+
+async def _post_json(
+    url: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str]
+) -> Tuple[int, str]:
+    """POST a JSON payload and return (status code, response body)"""
+    content = _dumps(payload)
+    
+    if AIOHTTP_AVAILABLE:
+        session = _get_aiohttp_session()
+        async with session.post(url, data=content, headers=headers) as response:
+            return response.status, await response.text()
+    
+    client = _get_http_client()
+    response = await client.post(url, content=content, headers=headers)
+    return response.status_code, response.text
+
+
+async def close_http_client():
+    """Close the shared HTTP session/client (called on application shutdown)"""
+    global _aiohttp_session, _http_client
+    if _aiohttp_session is not None:
+        await _aiohttp_session.close()
+        _aiohttp_session = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _header_block(text: str) -> Dict[str, Any]:
+    """Build a Block Kit header block"""
+    return {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": text,
+            "emoji": True
+        }
+    }
+
+
+def _button(text: str, action_id: str, **extra: Any) -> Dict[str, Any]:
+    """Build a Block Kit button element (without its value)"""
+    return {
+        "type": "button",
+        "text": {
+            "type": "plain_text",
+            "text": text,
+            "emoji": True
+        },
+        **extra,
+        "action_id": action_id
+    }
+
+
+# Maximum allowed clock skew/age of a signed Slack request, in seconds
+_SIGNATURE_MAX_AGE = 60 * 5
+
+_SEVERITY_EMOJI: Dict[str, str] = {
+    'critical': '🔴',
+    'high': '🟠',
+    'medium': '🟡',
+    'low': '🟢',
+}
+
+# Pre-built static alert blocks. These are shared between messages and only
+# ever read during serialization, so they are never copied.
+_ALERT_HEADERS: Dict[str, Dict[str, Any]] = {
+    severity: _header_block(f'{emoji} Secret Detected')
+    for severity, emoji in _SEVERITY_EMOJI.items()
+}
+_ALERT_HEADER_DEFAULT = _header_block('⚠️ Secret Detected')
+
+_BUTTON_VIEW = _button("View Details", "view_secret_details")
+_BUTTON_FALSE_POSITIVE = _button("Mark False Positive", "mark_false_positive")
+_BUTTON_ROTATE = _button("🔄 Auto-Rotate", "auto_rotate_secret", style="primary")
+
+
+# Formatted detection time, cached for the current second: [epoch second, text]
+_TIMESTAMP_CACHE: List[Any] = [0, '']
+
+
+def _detected_at() -> str:
+    """Current UTC time formatted for alerts, reformatted at most once per second"""
+    now = int(time.time())
+    if _TIMESTAMP_CACHE[0] != now:
+        _TIMESTAMP_CACHE[0] = now
+        _TIMESTAMP_CACHE[1] = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(now))
+    return _TIMESTAMP_CACHE[1]
+
+
+def _make_alert_builder(
+    header: Dict[str, Any],
+    severity_title: str
+) -> Callable[[Dict[str, Any]], List[Dict]]:
+    """
+    Create an alert block builder specialised for one severity.
+    The header and severity field are bound once; only finding-specific
+    fields are filled in per call.
+    """
+    severity_field = {
+        "type": "mrkdwn",
+        "text": f"*Severity:*\n{severity_title}"
+    }
+    
+    def build(finding: Dict[str, Any]) -> List[Dict]:
+        secret_id = str(finding.get('id', ''))
+        
+        return [
+            header,
+            {
+                "type": "section",
+                "fields": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Type:*\n{finding.get('secret_type', 'Unknown')}"
+                    },
+                    severity_field,
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Repository:*\n{finding.get('repository', 'Unknown')}"
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*File:*\n`{finding.get('file_path', 'Unknown')}`"
+                    }
+                ]
+            },
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": f"*Location:*\nLine {finding.get('line_number', '?')} • Commit `{finding.get('commit_hash', 'HEAD')[:8]}`"
+                }
+            },
+            {
+                "type": "context",
+                "elements": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"Detected at {_detected_at()}"
+                    }
+                ]
+            },
+            {
+                "type": "actions",
+                "elements": [
+                    {**_BUTTON_VIEW, "value": secret_id},
+                    {**_BUTTON_FALSE_POSITIVE, "value": secret_id},
+                    {**_BUTTON_ROTATE, "value": secret_id},
+                ]
+            }
+        ]
+    
+    return build
+
+
+# Alert block builders for the known severities, created at import time
+_ALERT_BUILDERS: Dict[str, Callable[[Dict[str, Any]], List[Dict]]] = {
+    severity: _make_alert_builder(header, severity.title())
+    for severity, header in _ALERT_HEADERS.items()
+}
+
+
+# Alert coalescing: alerts queued within this window (up to the batch size)
+# are sent as a single Slack message
+_ALERT_COALESCE_WINDOW = 1.0
+_ALERT_BATCH_SIZE = 20
+
+_alert_queue: Optional[asyncio.Queue] = None
+# Queued by stop_alert_worker: the worker flushes its current batch and exits
+_ALERT_STOP = object()
+_alert_worker_task: Optional[asyncio.Task] = None
+
+
+def _finding_key(finding: Dict[str, Any]) -> Tuple:
+    """Identity of a finding, used to drop duplicate queued alerts"""
+    if finding.get('id') is not None:
+        return ('id', finding['id'])
+    return (
+        finding.get('repository'),
+        finding.get('file_path'),
+        finding.get('line_number'),
+        finding.get('secret_type'),
+    )
+
+
+async def _flush_alerts(batch: List[Tuple["SlackIntegration", str, Dict[str, Any], str]]):
+    """Send a batch of queued alerts, one message per destination"""
+    groups: Dict[Tuple, List] = {}
+    for integration, channel, finding, severity in batch:
+        destination = (integration.webhook_url, integration.bot_token, channel)
+        groups.setdefault(destination, []).append((integration, channel, finding, severity))
+    
+    for items in groups.values():
+        integration, channel = items[0][0], items[0][1]
+        unique: Dict[Tuple, Tuple[Dict[str, Any], str]] = {}
+        for _, _, finding, severity in items:
+            unique.setdefault(_finding_key(finding), (finding, severity))
+        
+        try:
+            if len(unique) == 1:
+                finding, severity = next(iter(unique.values()))
+                await integration.send_alert(finding, channel=channel, severity=severity)
+            else:
+                await integration.send_alert_batch(list(unique.values()), channel=channel)
+        except Exception as e:
+            logger.error(f"Failed to send queued Slack alerts: {e}")
+
+
+async def _alert_worker():
+    """Drain the alert queue, coalescing alerts that arrive close together"""
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await _alert_queue.get()
+        if item is _ALERT_STOP:
+            return
+        batch = [item]
+        deadline = loop.time() + _ALERT_COALESCE_WINDOW
+        stopping = False
+        
+        while len(batch) < _ALERT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(_alert_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _ALERT_STOP:
+                stopping = True
+                break
+            batch.append(item)
+        
+        await _flush_alerts(batch)
+        if stopping:
+            return
+
+
+def _ensure_alert_worker() -> asyncio.Queue:
+    """Start the alert coalescing worker on the running loop if needed"""
+    global _alert_queue, _alert_worker_task
+    loop = asyncio.get_running_loop()
+    if (
+        _alert_worker_task is None
+        or _alert_worker_task.done()
+        or _alert_worker_task.get_loop() is not loop
+    ):
+        _alert_queue = asyncio.Queue()
+        _alert_worker_task = loop.create_task(_alert_worker())
+    return _alert_queue
+
+
+async def stop_alert_worker():
+    """Stop the coalescing worker, sending any alerts still queued"""
+    global _alert_queue, _alert_worker_task
+    if _alert_worker_task is None:
+        return
+    
+    # Let the worker finish the batch it holds rather than cancelling it
+    if not _alert_worker_task.done():
+        _alert_queue.put_nowait(_ALERT_STOP)
+        await _alert_worker_task
+    
+    pending = []
+    while not _alert_queue.empty():
+        item = _alert_queue.get_nowait()
+        if item is not _ALERT_STOP:
+            pending.append(item)
+    if pending:
+        await _flush_alerts(pending)
+    
+    _alert_queue = None
+    _alert_worker_task = None
+
 
 class SlackMessageType(str, Enum):
     """Types of Slack messages"""
@@ -57,9 +386,10 @@ class SlackIntegration:
         self.webhook_url = webhook_url or os.environ.get('SLACK_WEBHOOK_URL')
         self.bot_token = bot_token or os.environ.get('SLACK_BOT_TOKEN')
         self.signing_secret = signing_secret or os.environ.get('SLACK_SIGNING_SECRET')
+        self._signing_secret_bytes = self.signing_secret.encode('utf-8') if self.signing_secret else None
         
-        if not HTTPX_AVAILABLE:
-            self.logger.warning("httpx not installed. HTTP functionality limited.")
+        if not (AIOHTTP_AVAILABLE or HTTPX_AVAILABLE):
+            self.logger.warning("aiohttp/httpx not installed. HTTP functionality limited.")
         
         self._default_channel = os.environ.get('SLACK_DEFAULT_CHANNEL', '#security-alerts')
     
@@ -68,6 +398,10 @@ class SlackIntegration:
         """Check if Slack is properly configured"""
         return bool(self.webhook_url or self.bot_token)
     
+    async def aclose(self):
+        """Release pooled HTTP connections"""
+        await close_http_client()
+    
     def verify_signature(
         self,
         signature: str,
@@ -78,21 +412,31 @@ class SlackIntegration:
         Verify Slack request signature.
         Used for incoming webhook/event verification.
         """
-        if not self.signing_secret:
+        if not self._signing_secret_bytes:
             return False
         
-        # Check timestamp is recent (within 5 minutes)
-        if abs(time.time() - int(timestamp)) > 60 * 5:
+        # Check timestamp is plain ASCII digits and recent (within 5 minutes).
+        # int() alone also takes Unicode digits, whitespace and underscores.
+        if not isinstance(timestamp, str) or not timestamp.isascii() or not timestamp.isdigit():
             return False
+        ts = int(timestamp)
         
-        # Compute signature
-        sig_basestring = f'v0:{timestamp}:{body.decode()}'.encode('utf-8')
-        computed_signature = 'v0=' + hmac.new(
-            self.signing_secret.encode('utf-8'),
-            sig_basestring,
-            hashlib.sha256
-        ).hexdigest()
+        now = int(time.time())
+        if now - ts > _SIGNATURE_MAX_AGE or ts - now > _SIGNATURE_MAX_AGE:
+            return False
         
+        # Compute signature
+        # Feed the base string in pieces so the body is hashed in place
+        mac = hmac.new(self._signing_secret_bytes, None, hashlib.sha256)
+        mac.update(b'v0:')
+        mac.update(timestamp.encode('ascii'))
+        mac.update(b':')
+        mac.update(body)
+        computed_signature = 'v0=' + mac.hexdigest()
+        
+        # compare_digest raises on None, non-str and non-ASCII str values
+        if not isinstance(signature, str) or not signature.isascii():
+            return False
         return hmac.compare_digest(computed_signature, signature)
     
     async def send_webhook(
@@ -113,17 +457,16 @@ class SlackIntegration:
         if message.attachments:
             payload['attachments'] = message.attachments
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.webhook_url,
-                json=payload,
-                headers={'Content-Type': 'application/json'}
-            )
+        status_code, body = await _post_json(
+            self.webhook_url,
+            payload,
+            headers={'Content-Type': 'application/json'}
+        )
         
-        if response.status_code == 200 and response.text == 'ok':
+        if status_code == 200 and body == 'ok':
             return {'ok': True}
         
-        return {'ok': False, 'error': response.text}
+        return {'ok': False, 'error': body}
     
     async def send_api(
         self,
@@ -144,17 +487,16 @@ class SlackIntegration:
         if message.thread_ts:
             payload['thread_ts'] = message.thread_ts
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                'https://slack.com/api/chat.postMessage',
-                json=payload,
-                headers={
-                    'Authorization': f'Bearer {self.bot_token}',
-                    'Content-Type': 'application/json'
-                }
-            )
+        _, body = await _post_json(
+            'https://slack.com/api/chat.postMessage',
+            payload,
+            headers={
+                'Authorization': f'Bearer {self.bot_token}',
+                'Content-Type': 'application/json'
+            }
+        )
         
-        return response.json()
+        return json.loads(body)
     
     async def send_alert(
         self,
@@ -186,102 +528,87 @@ class SlackIntegration:
         else:
             return await self.send_webhook(message)
     
-    def _build_alert_blocks(
+    async def queue_alert(
         self,
         finding: Dict[str, Any],
-        severity: str
+        channel: str = None,
+        severity: str = 'high'
+    ) -> Dict[str, Any]:
+        """
+        Queue a secret finding alert for coalesced delivery.
+        
+        Alerts queued within a short window are deduplicated and sent as a
+        single message per channel, keeping scan bursts under Slack's rate
+        limits. Use send_alert to send immediately.
+        
+        Args:
+            finding: Secret finding details
+            channel: Target channel (defaults to configured channel)
+            severity: Alert severity (critical, high, medium, low)
+        """
+        queue = _ensure_alert_worker()
+        await queue.put((self, channel or self._default_channel, finding, severity))
+        return {'ok': True, 'queued': True}
+    
+    async def send_alert_batch(
+        self,
+        alerts: List[Tuple[Dict[str, Any], str]],
+        channel: str = None
+    ) -> Dict[str, Any]:
+        """
+        Send several secret finding alerts as one message.
+        
+        Args:
+            alerts: (finding, severity) pairs
+            channel: Target channel (defaults to configured channel)
+        """
+        critical = sum(1 for _, severity in alerts if severity.lower() == 'critical')
+        
+        message = SlackMessage(
+            channel=channel or self._default_channel,
+            text=f"🚨 {len(alerts)} Secrets Found ({critical} critical)",
+            blocks=self._build_batch_alert_blocks(alerts),
+            message_type=SlackMessageType.ALERT
+        )
+        
+        if self.bot_token:
+            return await self.send_api(message)
+        else:
+            return await self.send_webhook(message)
+    
+    def _build_batch_alert_blocks(
+        self,
+        alerts: List[Tuple[Dict[str, Any], str]]
     ) -> List[Dict]:
-        """Build Slack Block Kit message for alert"""
-        severity_emoji = {
-            'critical': '🔴',
-            'high': '🟠',
-            'medium': '🟡',
-            'low': '🟢'
-        }
+        """Build Slack Block Kit message for a batch of alerts"""
+        blocks = [_header_block(f"🚨 {len(alerts)} Secrets Detected")]
         
-        return [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"{severity_emoji.get(severity.lower(), '⚠️')} Secret Detected",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Type:*\n{finding.get('secret_type', 'Unknown')}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Severity:*\n{severity.title()}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Repository:*\n{finding.get('repository', 'Unknown')}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*File:*\n`{finding.get('file_path', 'Unknown')}`"
-                    }
-                ]
-            },
-            {
+        for finding, severity in alerts:
+            blocks.append({
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": f"*Location:*\nLine {finding.get('line_number', '?')} • Commit `{finding.get('commit_hash', 'HEAD')[:8]}`"
-                }
-            },
-            {
-                "type": "context",
-                "elements": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"Detected at {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}"
-                    }
-                ]
-            },
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "View Details",
-                            "emoji": True
-                        },
-                        "value": str(finding.get('id', '')),
-                        "action_id": "view_secret_details"
-                    },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "Mark False Positive",
-                            "emoji": True
-                        },
-                        "value": str(finding.get('id', '')),
-                        "action_id": "mark_false_positive"
-                    },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "🔄 Auto-Rotate",
-                            "emoji": True
-                        },
-                        "style": "primary",
-                        "value": str(finding.get('id', '')),
-                        "action_id": "auto_rotate_secret"
-                    }
-                ]
-            }
-        ]
+                    "text": (
+                        f"{_SEVERITY_EMOJI.get(severity.lower(), '⚠️')} *{finding.get('secret_type', 'Unknown')}* "
+                        f"({severity.title()}) in {finding.get('repository', 'Unknown')}\n"
+                        f"`{finding.get('file_path', 'Unknown')}` line {finding.get('line_number', '?')}"
+                    )
+                },
+                "accessory": {**_BUTTON_VIEW, "value": str(finding.get('id', ''))}
+            })
+        
+        return blocks
+    
+    def _build_alert_blocks(
+        self,
+        finding: Dict[str, Any],
+        severity: str
+    ) -> List[Dict]:
+        """Build Slack Block Kit message for alert"""
+        builder = _ALERT_BUILDERS.get(severity.lower())
+        if builder is None:
+            builder = _make_alert_builder(_ALERT_HEADER_DEFAULT, severity.title())
+        return builder(finding)
     
     async def send_digest(
         self,
@@ -387,33 +714,19 @@ class SlackIntegration:
         findings: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Aggregate findings for digest"""
-        from collections import Counter
+        severity_counts = Counter(f.get('severity', 'medium').lower() for f in findings)
+        repo_counts = Counter(f.get('repository', 'Unknown') for f in findings)
+        type_counts = Counter(f.get('secret_type', 'Unknown') for f in findings)
         
-        stats = {
+        return {
             'total': len(findings),
-            'critical': 0,
-            'high': 0,
-            'medium': 0,
-            'low': 0,
-            'top_repos': [],
-            'top_types': [],
+            'critical': severity_counts['critical'],
+            'high': severity_counts['high'],
+            'medium': severity_counts['medium'],
+            'low': severity_counts['low'],
+            'top_repos': repo_counts.most_common(10),
+            'top_types': type_counts.most_common(10),
         }
-        
-        repo_counts: Counter = Counter()
-        type_counts: Counter = Counter()
-        
-        for finding in findings:
-            severity = finding.get('severity', 'medium').lower()
-            if severity in stats:
-                stats[severity] += 1
-            
-            repo_counts[finding.get('repository', 'Unknown')] += 1
-            type_counts[finding.get('secret_type', 'Unknown')] += 1
-        
-        stats['top_repos'] = repo_counts.most_common(10)
-        stats['top_types'] = type_counts.most_common(10)
-        
-        return stats
     
     async def send_custom(
         self,
@@ -492,24 +805,19 @@ class SlackIntegration:
     ) -> Dict:
         """Handle mark as false positive action"""
         # Mark in database
-        from app.core.database import SessionLocal
-        from app.models.secret import Secret, SecretStatus
-        
-        db = SessionLocal()
-        try:
-            secret = db.query(Secret).filter(Secret.id == int(secret_id)).first()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Secret).where(Secret.id == int(secret_id)))
+            secret = result.scalar_one_or_none()
             if secret:
                 secret.status = SecretStatus.FALSE_POSITIVE.value
                 secret.resolved_at = datetime.now(timezone.utc)
-                db.commit()
+                await db.commit()
                 
                 return {
                     'response_type': 'in_channel',
                     'replace_original': True,
                     'text': f'✅ Secret #{secret_id} marked as false positive by <@{payload.get("user", {}).get("id")}>'
                 }
-        finally:
-            db.close()
         
         return {
             'response_type': 'ephemeral',
@@ -547,19 +855,16 @@ class SlackIntegration:
             /VaultSentry scan <repo> - Trigger a scan
             /VaultSentry report - Generate quick report
         """
-        parts = text.strip().split(' ')
-        subcommand = parts[0] if parts else 'help'
-        args = parts[1:] if len(parts) > 1 else []
-        
-        handlers = {
-            'status': self._cmd_status,
-            'scan': self._cmd_scan,
-            'report': self._cmd_report,
-            'help': self._cmd_help,
-        }
-        
-        handler = handlers.get(subcommand, self._cmd_help)
-        return await handler(args, user_id, channel_id)
+        subcommand, _, rest = text.strip().partition(' ')
+        args = rest.split()
+        
+        if subcommand == 'status':
+            return await self._cmd_status(args, user_id, channel_id)
+        if subcommand == 'scan':
+            return await self._cmd_scan(args, user_id, channel_id)
+        if subcommand == 'report':
+            return await self._cmd_report(args, user_id, channel_id)
+        return await self._cmd_help(args, user_id, channel_id)
     
     async def _cmd_status(
         self,
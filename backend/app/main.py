@@ -6,8 +6,9 @@ Cloud-Native Secret Detection & Security Platform
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from loguru import logger
+import ssl
 import sys
 
 from app.core.config import settings
@@ -35,10 +36,22 @@ logger.add(
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info("[*] Starting Vault Sentry API Server...")
+    logger.info(f"[*] Crypto backend: {ssl.OPENSSL_VERSION}")
     await init_db()
     logger.info("[+] Database initialized successfully")
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        import redis.asyncio as aioredis
+        app.state.redis = aioredis.from_url(settings.REDIS_URL)
+        logger.info("[+] Redis rate limiting enabled")
     yield
     logger.info("[x] Shutting down Vault Sentry API Server...")
+    if getattr(app.state, "redis", None) is not None:
+        await app.state.redis.aclose()
+    from app.integrations.slack_integration import close_http_client, stop_alert_worker
+    from app.integrations.jira_integration import close_http_client as close_jira_client
+    await stop_alert_worker()
+    await close_http_client()
+    await close_jira_client()
 
 
 app = FastAPI(
@@ -66,6 +79,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/api/v1/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -86,7 +100,7 @@ app.add_middleware(RateLimitMiddleware)
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -124,10 +138,16 @@ async def root():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
+        # uvloop/httptools ship with uvicorn[standard]; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        # Reload is development-only and cannot be combined with multiple workers
+        workers=1 if settings.DEBUG else int(os.environ.get("WORKERS", 1)),
         reload=settings.DEBUG
     )
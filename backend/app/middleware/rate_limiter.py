@@ -3,28 +3,64 @@ Vault Sentry - Rate Limiting Middleware
 """
 
 import time
-from collections import defaultdict
-from typing import Dict, Tuple
+import asyncio
+import itertools
+from array import array
+from typing import Tuple
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from loguru import logger
 
 from app.core.config import settings
 
 
+# Atomic sliding-window check: drop expired entries, count, and record the
+# request if under the limit. Returns remaining requests, or -1 if limited.
+_SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('EXPIRE', key, window)
+    return limit - count - 1
+end
+return -1
+"""
+
+# Number of in-memory rate-limit buckets (power of two). Clients are hashed
+# into buckets, so memory is fixed regardless of how many IPs are seen.
+_BUCKET_COUNT = 1 << 16
+
+# Paths that are never rate limited (health checks and API docs)
+_BYPASS_PATHS = frozenset({"/health", "/docs", "/redoc", "/openapi.json", "/api/v1/openapi.json"})
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
-    Simple in-memory rate limiting middleware.
-    For production, use Redis-based rate limiting.
+    Rate limiting middleware.
+    Uses a Redis sliding window (shared across workers) when app.state.redis
+    is set by the application lifespan. Otherwise falls back to in-memory,
+    per-process fixed windows in hashed buckets; rare bucket collisions make
+    this approximate.
     """
     
     def __init__(self, app):
         super().__init__(app)
-        # Store: {ip: [(timestamp, count)]}
-        self.requests: Dict[str, list] = defaultdict(list)
         self.rate_limit = settings.RATE_LIMIT_REQUESTS
         self.window = settings.RATE_LIMIT_WINDOW
+        
+        # Per-bucket window start time and request count
+        self._window_start = array('d', bytes(8 * _BUCKET_COUNT))
+        self._count = array('i', bytes(4 * _BUCKET_COUNT))
+        
+        # Redis script handle, registered on first use
+        self._redis_script = None
+        self._redis_seq = itertools.count()
     
     def _get_client_ip(self, request: Request) -> str:
         """Get client IP address from request"""
@@ -35,36 +71,65 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     
     def _is_rate_limited(self, client_ip: str) -> Tuple[bool, int]:
         """Check if client is rate limited. Returns (is_limited, remaining)."""
-        current_time = time.time()
-        window_start = current_time - self.window
+        # Monotonic event-loop clock: immune to wall-clock jumps
+        current_time = asyncio.get_running_loop().time()
+        idx = hash(client_ip) & (_BUCKET_COUNT - 1)
         
-        # Clean old requests
-        self.requests[client_ip] = [
-            ts for ts in self.requests[client_ip] 
-            if ts > window_start
-        ]
+        # Start a new window if the bucket's current one has expired
+        if current_time - self._window_start[idx] >= self.window:
+            self._window_start[idx] = current_time
+            self._count[idx] = 0
         
-        request_count = len(self.requests[client_ip])
+        request_count = self._count[idx]
         remaining = max(0, self.rate_limit - request_count)
         
         if request_count >= self.rate_limit:
             return True, remaining
         
         # Add current request
-        self.requests[client_ip].append(current_time)
+        self._count[idx] = request_count + 1
         return False, remaining - 1
     
+    async def _is_rate_limited_redis(self, redis_client, client_ip: str) -> Tuple[bool, int]:
+        """Check rate limit against the shared Redis sliding window."""
+        if self._redis_script is None:
+            self._redis_script = redis_client.register_script(_SLIDING_WINDOW_LUA)
+        
+        # Wall-clock time, since the window is shared across processes
+        current_time = time.time()
+        remaining = await self._redis_script(
+            keys=[f"ratelimit:{client_ip}"],
+            args=[current_time, self.window, self.rate_limit, f"{current_time}:{next(self._redis_seq)}"],
+            client=redis_client
+        )
+        remaining = int(remaining)
+        
+        if remaining < 0:
+            return True, 0
+        return False, remaining
+    
+    async def _check_rate_limit(self, request: Request, client_ip: str) -> Tuple[bool, int]:
+        """Check rate limit using Redis if available, in-memory otherwise."""
+        redis_client = getattr(request.app.state, "redis", None)
+        if redis_client is not None:
+            try:
+                return await self._is_rate_limited_redis(redis_client, client_ip)
+            except Exception as e:
+                logger.warning(f"Redis rate limiting unavailable, using in-memory: {e}")
+        
+        return self._is_rate_limited(client_ip)
+    
     async def dispatch(self, request: Request, call_next) -> Response:
-        # Skip rate limiting for health checks and docs
-        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
+        # Skip rate limiting for CORS preflight, health checks and docs
+        if request.method == "OPTIONS" or request.url.path in _BYPASS_PATHS:
             return await call_next(request)
         
         client_ip = self._get_client_ip(request)
-        is_limited, remaining = self._is_rate_limited(client_ip)
+        is_limited, remaining = await self._check_rate_limit(request, client_ip)
         
         if is_limited:
             logger.warning(f"Rate limit exceeded for {client_ip}")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=429,
                 content={
                     "detail": "Too many requests. Please try again later.",
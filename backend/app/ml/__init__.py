@@ -4,9 +4,18 @@ ML-driven risk scoring and prioritization
 """
 
 from app.ml.risk_scorer import RiskScorer, SecretFeatures
-from app.ml.model_trainer import ModelTrainer
 from app.ml.feature_extractor import FeatureExtractor
 
+
+def __getattr__(name):
+    # ModelTrainer pulls in scikit-learn and XGBoost; only import it when
+    # training code asks for it, not whenever the scorer is used
+    if name == "ModelTrainer":
+        from app.ml.model_trainer import ModelTrainer
+        return ModelTrainer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "RiskScorer",
     "SecretFeatures", 
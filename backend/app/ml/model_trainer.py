@@ -6,6 +6,7 @@ Train XGBoost/RandomForest models for risk scoring
 import os
 import pickle
 import json
+import string
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
@@ -32,7 +33,23 @@ except ImportError:
     XGBOOST_AVAILABLE = False
     logger.warning("XGBoost not installed. Using RandomForest as fallback.")
 
-from app.ml.feature_extractor import SecretFeatures
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import joblib
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+    logger.warning("joblib not installed. Model artifacts will use plain pickle.")
+
+from app.ml.feature_extractor import (
+    FEATURE_NAMES, FEATURE_COUNT, FEATURE_COLUMNS,
+    COL_FILE_FLAGS, COL_REPO_SENSITIVITY, COL_SNIPPET_FLAGS, COL_CONFIDENCE,
+    byte_rows_entropy, get_feature_extractor,
+)
 
 
 class ModelTrainer:
@@ -43,9 +60,15 @@ class ModelTrainer:
     
     MODEL_PATH = Path("app/ml/models")
     MODEL_FILE = "risk_model.pkl"
+    NATIVE_MODEL_FILE = "risk_model.ubj"
     SCALER_FILE = "scaler.pkl"
     CONFIG_FILE = "model_config.json"
-    TRAINING_HISTORY_FILE = "training_history.json"
+    TRAINING_HISTORY_FILE = "training_history.jsonl"
+    HISTORY_MAX_ENTRIES = 100
+    HISTORY_COMPACT_BYTES = 64 * 1024
+    
+    # Tree ensembles split on thresholds, so feature scaling cannot change them
+    SCALE_INVARIANT_MODELS = frozenset({"xgboost", "random_forest"})
     
     def __init__(self, model_type: str = "xgboost"):
         """
@@ -60,11 +83,21 @@ class ModelTrainer:
         self.model_type = model_type
         self.model = None
         self.scaler = None
+        self._extractor = get_feature_extractor()
         self.logger = logger.bind(module="model_trainer")
         
         # Ensure model directory exists
         self.MODEL_PATH.mkdir(parents=True, exist_ok=True)
     
+    def _fit_scaler(self, X: np.ndarray) -> np.ndarray:
+        """Fit a StandardScaler if the model type needs one and return the features to train on"""
+        if self.model_type in self.SCALE_INVARIANT_MODELS:
+            self.scaler = None
+            return X
+        
+        self.scaler = StandardScaler()
+        return self.scaler.fit_transform(X)
+    
     def _create_model(self, model_type: str = None):
         """Create a new model instance"""
         model_type = model_type or self.model_type
@@ -106,14 +139,9 @@ class ModelTrainer:
             labels: List of labels (0=low risk, 1=high risk)
             
         Returns:
-            Tuple of (feature_matrix, labels)
+            Tuple of (float32 feature_matrix, labels)
         """
-        from app.ml.feature_extractor import FeatureExtractor
-        
-        extractor = FeatureExtractor()
-        features_list = extractor.extract_batch(findings)
-        
-        X = np.array([f.to_vector() for f in features_list])
+        X = self._extractor.extract_batch_matrix(findings)
         y = np.array(labels)
         
         return X, y
@@ -141,9 +169,12 @@ class ModelTrainer:
         """
         self.logger.info(f"Training {self.model_type} model with {len(X)} samples")
         
+        # Both XGBoost and sklearn trees work in float32; cast once up front
+        # so the split, CV folds and fit never copy a float64 matrix
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        
         # Scale features
-        self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
+        X_scaled = self._fit_scaler(X)
         
         # Split data
         X_train, X_val, y_train, y_val = train_test_split(
@@ -195,9 +226,8 @@ class ModelTrainer:
         
         # Feature importance
         if hasattr(self.model, 'feature_importances_'):
-            feature_names = SecretFeatures.feature_names()
             importances = self.model.feature_importances_
-            results["feature_importance"] = dict(zip(feature_names, importances.tolist()))
+            results["feature_importance"] = dict(zip(FEATURE_NAMES, importances.tolist()))
         
         self.logger.info(f"Training complete. F1: {results['f1_score']:.3f}, Accuracy: {results['accuracy']:.3f}")
         
@@ -258,22 +288,41 @@ class ModelTrainer:
         if self.model is None:
             raise ValueError("No model to save. Train a model first.")
         
-        # Save model
-        model_path = self.MODEL_PATH / self.MODEL_FILE
-        with open(model_path, 'wb') as f:
-            pickle.dump(self.model, f)
-        
-        # Save scaler
+        # Save model. Write then rename so a scorer that has the previous
+        # artifact memory-mapped keeps reading the old file until it reloads.
+        if XGBOOST_AVAILABLE and isinstance(self.model, xgb.XGBModel):
+            # XGBoost's native UBJSON format loads far faster than unpickling
+            model_path = self.MODEL_PATH / self.NATIVE_MODEL_FILE
+            stale_path = self.MODEL_PATH / self.MODEL_FILE
+            tmp_path = model_path.with_name('risk_model.tmp.ubj')
+            self.model.save_model(tmp_path)
+        else:
+            model_path = self.MODEL_PATH / self.MODEL_FILE
+            stale_path = self.MODEL_PATH / self.NATIVE_MODEL_FILE
+            tmp_path = model_path.with_suffix('.tmp')
+            if JOBLIB_AVAILABLE:
+                # Uncompressed so load_model can memory-map the estimator arrays
+                joblib.dump(self.model, tmp_path)
+            else:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(self.model, f)
+        os.replace(tmp_path, model_path)
+        stale_path.unlink(missing_ok=True)
+        
+        # Save scaler, dropping any stale one when the model is unscaled
+        scaler_path = self.MODEL_PATH / self.SCALER_FILE
         if self.scaler is not None:
-            scaler_path = self.MODEL_PATH / self.SCALER_FILE
             with open(scaler_path, 'wb') as f:
                 pickle.dump(self.scaler, f)
+        else:
+            scaler_path.unlink(missing_ok=True)
         
         # Save config
         config = {
             "model_type": self.model_type,
-            "feature_count": len(SecretFeatures.feature_names()),
-            "feature_names": SecretFeatures.feature_names(),
+            "model_file": model_path.name,
+            "feature_count": len(FEATURE_NAMES),
+            "feature_names": list(FEATURE_NAMES),
             "saved_at": datetime.utcnow().isoformat(),
             "version": "1.0.0",
         }
@@ -289,15 +338,26 @@ class ModelTrainer:
     
     def load_model(self) -> bool:
         """Load model from disk"""
-        model_path = self.MODEL_PATH / self.MODEL_FILE
+        native_path = self.MODEL_PATH / self.NATIVE_MODEL_FILE
+        model_path = native_path if native_path.exists() else self.MODEL_PATH / self.MODEL_FILE
         
         if not model_path.exists():
             return False
         
         try:
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            if model_path == native_path:
+                if not XGBOOST_AVAILABLE:
+                    raise RuntimeError("XGBoost is required to load a native model")
+                self.model = xgb.XGBClassifier()
+                self.model.load_model(model_path)
+            elif JOBLIB_AVAILABLE:
+                # Estimator arrays are mapped read-only instead of copied
+                self.model = joblib.load(model_path, mmap_mode='r')
+            else:
+                with open(model_path, 'rb') as f:
+                    self.model = pickle.load(f)
             
+            self.scaler = None
             scaler_path = self.MODEL_PATH / self.SCALER_FILE
             if scaler_path.exists():
                 with open(scaler_path, 'rb') as f:
@@ -345,8 +405,7 @@ class ModelTrainer:
         weights[:n_existing] *= learning_rate_decay
         
         # Train new model
-        self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
+        X_scaled = self._fit_scaler(X)
         
         self.model = self._create_model()
         
@@ -377,100 +436,222 @@ class ModelTrainer:
         }
     
     def _record_training_history(self, entry: Dict[str, Any]):
-        """Record training event to history file"""
+        """Append a training event to the JSONL history file"""
         history_path = self.MODEL_PATH / self.TRAINING_HISTORY_FILE
+        line = json.dumps(entry) + '\n'
+        
+        if fcntl is None:
+            with open(history_path, 'a') as f:
+                f.write(line)
+            return
+        
+        # Serialize appends and compaction across worker processes. Compaction
+        # replaces the file, so retry if the locked handle went stale meanwhile.
+        while True:
+            with open(history_path, 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    if os.fstat(f.fileno()).st_ino != os.stat(history_path).st_ino:
+                        continue
+                    f.write(line)
+                    f.flush()
+                    if f.tell() > self.HISTORY_COMPACT_BYTES:
+                        self._compact_history(history_path)
+                    return
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def _compact_history(self, history_path: Path):
+        """Rewrite the history file keeping only the most recent entries"""
+        with open(history_path, 'r') as f:
+            lines = f.readlines()[-self.HISTORY_MAX_ENTRIES:]
+        
+        tmp_path = history_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            f.writelines(lines)
+        os.replace(tmp_path, history_path)
+    
+    # Synthetic data distributions, indexed by label (0=low risk, 1=high risk)
+    _SYNTHETIC_TYPES = (
+        ('api_key', 'generic_secret', 'password'),
+        ('aws_access_key', 'github_token', 'private_key', 'database_url'),
+    )
+    _SYNTHETIC_PATHS = (
+        ('tests/test_config.py', 'examples/demo.py', 'docs/sample.md', 'mock/fixtures.json'),
+        ('src/config/production.py', 'deploy/secrets.yaml', 'backend/settings.py', '.env.production'),
+    )
+    _SYNTHETIC_CONFIDENCE = ((0.5, 0.8), (0.7, 0.99))
+    _SYNTHETIC_ALPHABET = np.frombuffer(
+        (string.ascii_letters + string.digits).encode('ascii'), dtype=np.uint8
+    )
+    _SYNTHETIC_MIN_LEN = 20
+    _SYNTHETIC_MAX_LEN = 60
+    
+    def _synthetic_columns(
+        self,
+        n_samples: int,
+        high_risk_ratio: float,
+        seed: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Sample raw synthetic findings as column arrays.
         
-        history = []
-        if history_path.exists():
-            try:
-                with open(history_path, 'r') as f:
-                    history = json.load(f)
-            except:
-                pass
+        Types and file paths are stored as indices into the per-label
+        tuples; secret values are ASCII byte rows padded to the max length.
+        """
+        rng = np.random.default_rng(seed)
         
-        history.append(entry)
+        n_high_risk = int(n_samples * high_risk_ratio)
+        labels = np.zeros(n_samples, dtype=np.int64)
+        labels[:n_high_risk] = 1
+        rng.shuffle(labels)
+        high = labels.astype(bool)
         
-        # Keep last 100 entries
-        history = history[-100:]
+        lengths = rng.integers(
+            self._SYNTHETIC_MIN_LEN, self._SYNTHETIC_MAX_LEN + 1, size=n_samples
+        )
+        values = self._SYNTHETIC_ALPHABET[
+            rng.integers(0, len(self._SYNTHETIC_ALPHABET), size=(n_samples, self._SYNTHETIC_MAX_LEN))
+        ]
+        
+        type_idx = np.where(
+            high,
+            rng.integers(0, len(self._SYNTHETIC_TYPES[1]), size=n_samples),
+            rng.integers(0, len(self._SYNTHETIC_TYPES[0]), size=n_samples),
+        )
+        path_idx = np.where(
+            high,
+            rng.integers(0, len(self._SYNTHETIC_PATHS[1]), size=n_samples),
+            rng.integers(0, len(self._SYNTHETIC_PATHS[0]), size=n_samples),
+        )
+        (low_lo, low_hi), (high_lo, high_hi) = self._SYNTHETIC_CONFIDENCE
+        confidence = np.where(
+            high,
+            rng.uniform(high_lo, high_hi, size=n_samples),
+            rng.uniform(low_lo, low_hi, size=n_samples),
+        )
         
-        with open(history_path, 'w') as f:
-            json.dump(history, f, indent=2)
+        return {
+            'labels': labels,
+            'lengths': lengths,
+            'values': values,
+            'type_idx': type_idx,
+            'path_idx': path_idx,
+            'confidence': confidence,
+            'line_number': rng.integers(1, 501, size=n_samples),
+        }
+    
+    @staticmethod
+    def _synthetic_snippet(secret_value: str, high_risk: bool) -> str:
+        """Code snippet surrounding a synthetic secret"""
+        if high_risk:
+            return f'secret = "{secret_value[:10]}..."'
+        return f'# example: {secret_value[:10]}'
+    
+    def generate_synthetic_matrix(
+        self,
+        n_samples: int = 1000,
+        high_risk_ratio: float = 0.3,
+        seed: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generate synthetic training data directly as a feature matrix.
+        
+        Equivalent to prepare_training_data(*generate_synthetic_data(...)) for
+        the same seed, without building a finding dict per sample.
+        
+        Returns:
+            Tuple of (feature_matrix, labels)
+        """
+        extractor = self._extractor
+        cols = self._synthetic_columns(n_samples, high_risk_ratio, seed)
+        labels = cols['labels']
+        lengths = cols['lengths']
+        values = cols['values']
+        rows = np.arange(n_samples)
+        
+        X = np.zeros((n_samples, FEATURE_COUNT), dtype=np.float32)
+        
+        # Entropy in one tight loop over the byte rows
+        X[:, 0] = byte_rows_entropy(values, lengths)
+        X[:, 1] = lengths / 100.0
+        
+        # One-hot type and file location flags via per-label lookup tables
+        for label in (0, 1):
+            mask = labels == label
+            type_cols = np.array([
+                FEATURE_COLUMNS[extractor._secret_type_attr(t)]
+                for t in self._SYNTHETIC_TYPES[label]
+            ])
+            X[rows[mask], type_cols[cols['type_idx'][mask]]] = 1.0
+            
+            path_flags = np.array([
+                extractor._file_path_flags(p) for p in self._SYNTHETIC_PATHS[label]
+            ], dtype=np.float32)
+            X[mask, COL_FILE_FLAGS:COL_FILE_FLAGS + 6] = path_flags[cols['path_idx'][mask]]
+        
+        # No repository metadata; commits are dated "now", so age columns stay 0
+        X[:, COL_REPO_SENSITIVITY] = 0.5
+        X[:, COL_CONFIDENCE] = cols['confidence']
+        
+        # Snippets only vary in the 10-character secret prefix
+        prefixes = values[:, :10]
+        for i in range(n_samples):
+            snippet = self._synthetic_snippet(prefixes[i].tobytes().decode('ascii'), bool(labels[i]))
+            X[i, COL_SNIPPET_FLAGS:COL_SNIPPET_FLAGS + 5] = extractor._snippet_flags(snippet)
+        
+        return X, labels
     
     def generate_synthetic_data(
         self,
         n_samples: int = 1000,
-        high_risk_ratio: float = 0.3
+        high_risk_ratio: float = 0.3,
+        seed: Optional[int] = None
     ) -> Tuple[List[Dict], List[int]]:
         """
         Generate synthetic training data for initial model training.
         Based on realistic distributions of secret characteristics.
         
+        Prefer generate_synthetic_matrix when only the feature matrix is needed.
+        
+        Args:
+            n_samples: Number of findings to generate
+            high_risk_ratio: Fraction of findings labelled high risk
+            seed: Seed for reproducible data; random when None
+        
         Returns:
             Tuple of (findings_list, labels)
         """
-        import random
+        cols = self._synthetic_columns(n_samples, high_risk_ratio, seed)
+        committed_at = datetime.utcnow().isoformat()
         
-        findings = []
-        labels = []
-        
-        n_high_risk = int(n_samples * high_risk_ratio)
-        n_low_risk = n_samples - n_high_risk
-        
-        # Generate high-risk samples
-        for _ in range(n_high_risk):
-            finding = self._generate_synthetic_finding(high_risk=True)
-            findings.append(finding)
-            labels.append(1)
-        
-        # Generate low-risk samples  
-        for _ in range(n_low_risk):
-            finding = self._generate_synthetic_finding(high_risk=False)
-            findings.append(finding)
-            labels.append(0)
-        
-        # Shuffle
-        combined = list(zip(findings, labels))
-        random.shuffle(combined)
-        findings, labels = zip(*combined)
-        
-        return list(findings), list(labels)
-    
-    def _generate_synthetic_finding(self, high_risk: bool) -> Dict[str, Any]:
-        """Generate a single synthetic finding"""
-        import random
-        import string
+        # Convert every column to Python objects in bulk; indexing NumPy
+        # arrays element by element inside the loop is far slower
+        labels = cols['labels'].tolist()
+        width = cols['values'].shape[1]
+        blob = cols['values'].tobytes().decode('ascii')
         
-        if high_risk:
-            secret_types = ['aws_access_key', 'github_token', 'private_key', 'database_url']
-            file_paths = [
-                'src/config/production.py',
-                'deploy/secrets.yaml',
-                'backend/settings.py',
-                '.env.production',
-            ]
-            entropy_range = (4.0, 5.5)
-        else:
-            secret_types = ['api_key', 'generic_secret', 'password']
-            file_paths = [
-                'tests/test_config.py',
-                'examples/demo.py',
-                'docs/sample.md',
-                'mock/fixtures.json',
-            ]
-            entropy_range = (2.0, 4.0)
-        
-        # Generate random secret value
-        length = random.randint(20, 60)
-        secret_value = ''.join(random.choices(string.ascii_letters + string.digits, k=length))
-        
-        return {
-            'secret_value': secret_value,
-            'type': random.choice(secret_types),
-            'file_path': random.choice(file_paths),
-            'line_number': random.randint(1, 500),
-            'code_snippet': f'secret = "{secret_value[:10]}..."' if high_risk else f'# example: {secret_value[:10]}',
-            'confidence': random.uniform(0.7, 0.99) if high_risk else random.uniform(0.5, 0.8),
-            'commit_metadata': {
-                'date': datetime.utcnow().isoformat(),
-            }
-        }
+        findings = []
+        for i, (label, length, type_idx, path_idx, line_number, confidence) in enumerate(zip(
+            labels,
+            cols['lengths'].tolist(),
+            cols['type_idx'].tolist(),
+            cols['path_idx'].tolist(),
+            cols['line_number'].tolist(),
+            cols['confidence'].tolist(),
+        )):
+            start = i * width
+            secret_value = blob[start:start + length]
+            findings.append({
+                'secret_value': secret_value,
+                'type': self._SYNTHETIC_TYPES[label][type_idx],
+                'file_path': self._SYNTHETIC_PATHS[label][path_idx],
+                'line_number': line_number,
+                'code_snippet': self._synthetic_snippet(secret_value, bool(label)),
+                'confidence': confidence,
+                'commit_metadata': {
+                    'date': committed_at,
+                },
+            })
+        
+        return findings, labels
@@ -6,13 +6,49 @@ XGBoost/RandomForest-based risk scoring for secrets
 import os
 import pickle
 import json
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import numpy as np
 from loguru import logger
 
-from app.ml.feature_extractor import SecretFeatures, FeatureExtractor
+try:
+    import joblib
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+from app.ml.feature_extractor import FEATURE_COUNT, SecretFeatures, get_feature_extractor
+
+
+def _factor(factor: str, impact: str, description: str) -> Callable[[SecretFeatures], Dict[str, str]]:
+    """Explanation rule body with a fixed description"""
+    return lambda features: {"factor": factor, "impact": impact, "description": description}
+
+
+# Explanation rules in display order: (applies to features, build factor)
+_EXPLAIN_RULES: Tuple[Tuple[Callable[[SecretFeatures], bool], Callable[[SecretFeatures], Dict[str, str]]], ...] = (
+    (attrgetter('is_aws_key'), _factor("AWS Key Type", "high", "AWS credentials have high blast radius")),
+    (attrgetter('is_private_key'), _factor("Private Key", "critical", "Private keys should never be committed")),
+    (attrgetter('repo_is_public'), _factor("Public Repository", "high", "Secret is exposed in public repo")),
+    (attrgetter('is_production_file'), _factor("Production File", "high", "Located in production configuration")),
+    (attrgetter('is_hardcoded'), _factor("Hardcoded Value", "medium", "Value appears to be hardcoded")),
+    (
+        lambda f: f.entropy > 4.0,
+        lambda f: {"factor": "High Entropy", "impact": "medium", "description": f"Entropy: {f.entropy:.2f} bits"},
+    ),
+    (attrgetter('is_test_file'), _factor("Test File", "low", "Located in test file (reduced risk)")),
+    (attrgetter('is_example_file'), _factor("Example File", "low", "Appears to be example/sample")),
+    (
+        lambda f: f.time_exposed_hours > 24 * 30,
+        lambda f: {"factor": "Long Exposure", "impact": "high", "description": f"Exposed for {int(f.time_exposed_hours / 24)} days"},
+    ),
+)
 
 
 class RiskScorer:
@@ -24,6 +60,7 @@ class RiskScorer:
     
     MODEL_PATH = Path("app/ml/models")
     MODEL_FILE = "risk_model.pkl"
+    NATIVE_MODEL_FILE = "risk_model.ubj"
     CONFIG_FILE = "model_config.json"
     
     # Heuristic weights for fallback scoring
@@ -56,6 +93,24 @@ class RiskScorer:
         'low': 20,
     }
     
+    # Business impact multipliers by repository type and data classification
+    REPO_IMPACT_MULTIPLIERS = {
+        'public': 1.5,
+        'internal': 1.0,
+        'confidential': 1.3,
+        'restricted': 1.5,
+    }
+    
+    DATA_IMPACT_MULTIPLIERS = {
+        'public': 0.8,
+        'internal': 1.0,
+        'confidential': 1.3,
+        'restricted': 1.5,
+    }
+    
+    # Findings in one scan often share a feature vector; remember their scores
+    PREDICTION_CACHE_SIZE = 8192
+    
     def __init__(self, model_type: str = "xgboost"):
         """
         Initialize the risk scorer.
@@ -63,26 +118,96 @@ class RiskScorer:
         Args:
             model_type: Type of model to use ("xgboost" or "random_forest")
         """
+        # Scoring and explanation read SecretFeatures attributes per call and
+        # rely on them being slots rather than instance __dict__ entries
+        assert not hasattr(SecretFeatures(), '__dict__'), "SecretFeatures must use __slots__"
+        
         self.model_type = model_type
         self.model = None
-        self.feature_extractor = FeatureExtractor()
+        self._booster = None
+        self._prediction_cache: OrderedDict = OrderedDict()
+        
+        # Boolean heuristic factors in one fixed order: the weight vector drives
+        # the batch dot product, the getters the single-secret loop (for one
+        # secret a numpy dot costs more than the 17 attribute lookups it replaces)
+        self._flag_keys = tuple(k for k in self.HEURISTIC_WEIGHTS if k != 'entropy')
+        self._flag_weights = np.array(
+            [self.HEURISTIC_WEIGHTS[k] for k in self._flag_keys], dtype=np.float64
+        )
+        self._flag_getters = [
+            (attrgetter(k), self.HEURISTIC_WEIGHTS[k]) for k in self._flag_keys
+        ]
+        # Ascending thresholds; bisect_right(bounds, score) indexes _risk_levels
+        ordered = sorted(self.RISK_THRESHOLDS.items(), key=lambda item: item[1])
+        self._risk_bounds = [threshold for _, threshold in ordered]
+        self._risk_levels = ('info',) + tuple(level for level, _ in ordered)
+        self.feature_extractor = get_feature_extractor()
         self.logger = logger.bind(module="risk_scorer")
         self._load_model()
     
     def _load_model(self):
-        """Load trained model from disk if available"""
-        model_path = self.MODEL_PATH / self.MODEL_FILE
+        """
+        Load trained model from disk if available.
+        
+        XGBoost models load from their native .ubj file. Other estimators
+        (RandomForest) must be written with joblib.dump, as
+        ModelTrainer.save_model does, so their tree arrays can be
+        memory-mapped here and shared between forked workers through the
+        page cache instead of being copied into each worker.
+        """
+        native_path = self.MODEL_PATH / self.NATIVE_MODEL_FILE
+        model_path = native_path if native_path.exists() else self.MODEL_PATH / self.MODEL_FILE
         
         if model_path.exists():
             try:
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
+                if model_path == native_path:
+                    # Imported here so heuristic-only workers never pay for it
+                    try:
+                        import xgboost as xgb
+                    except ImportError:
+                        raise RuntimeError("XGBoost is required to load a native model")
+                    # Native UBJSON load; the sklearn wrapper keeps predict_proba
+                    self.model = xgb.XGBClassifier()
+                    self.model.load_model(model_path)
+                elif JOBLIB_AVAILABLE:
+                    # Estimator arrays are mapped read-only instead of copied
+                    self.model = joblib.load(model_path, mmap_mode='r')
+                else:
+                    with open(model_path, 'rb') as f:
+                        self.model = pickle.load(f)
                 self.logger.info(f"Loaded risk scoring model from {model_path}")
             except Exception as e:
                 self.logger.warning(f"Failed to load model: {e}. Using heuristic scoring.")
                 self.model = None
         else:
             self.logger.info("No trained model found. Using heuristic scoring.")
+        
+        # Cached predictions belong to the previous model
+        self._prediction_cache.clear()
+        
+        # XGBoost classifiers are scored through the booster's inplace_predict,
+        # which reads float32 arrays directly without building a DMatrix
+        self._booster = None
+        if hasattr(self.model, 'get_booster') and hasattr(self.model, 'predict_proba'):
+            try:
+                self._booster = self.model.get_booster()
+                # Batches are scored in one inplace_predict call; let it use
+                # every core rather than whatever n_jobs the model was fit with
+                self._booster.set_param({'nthread': os.cpu_count() or 1})
+            except Exception:
+                self._booster = None
+        
+        if self._booster is not None:
+            # The first prediction sets up XGBoost's per-thread buffers; pay for
+            # it here rather than on the first scored secret
+            try:
+                start = time.perf_counter()
+                self._booster.inplace_predict(np.zeros((1, FEATURE_COUNT), dtype=np.float32))
+                self.logger.debug(
+                    f"Warmed up predictor in {(time.perf_counter() - start) * 1000:.1f}ms"
+                )
+            except Exception as e:
+                self.logger.debug(f"Predictor warm-up failed: {e}")
     
     def score(self, features: SecretFeatures) -> float:
         """
@@ -98,22 +223,73 @@ class RiskScorer:
             return self._ml_score(features)
         return self._heuristic_score(features)
     
+    def _predict_scores(self, X: np.ndarray) -> np.ndarray:
+        """
+        Run the model over a C-contiguous float32 feature matrix.
+        
+        Returns:
+            Unclipped risk scores, one per row
+        """
+        if self._booster is not None:
+            # Binary classifier: probability of the high risk class
+            out = self._booster.inplace_predict(X)
+            return (out[:, -1] if out.ndim == 2 else out) * 100
+        
+        if hasattr(self.model, 'predict_proba'):
+            # Classification model - use probability of high risk class
+            # Assume binary classification: 0=low risk, 1=high risk
+            return self.model.predict_proba(X)[:, -1] * 100
+        
+        # Regression model - direct score prediction
+        return self.model.predict(X)
+    
+    def _score_from_vectors(self, X: np.ndarray) -> List[float]:
+        """
+        Score prebuilt feature rows, consulting the prediction cache.
+        
+        Rows already seen are answered from the cache; the rest go to the
+        model in a single call.
+        
+        Args:
+            X: C-contiguous (n, FEATURE_COUNT) float32 feature matrix
+            
+        Returns:
+            Risk scores between 0-100, one per row
+        """
+        cache = self._prediction_cache
+        
+        # The raw float32 bytes identify each vector exactly
+        keys = [row.tobytes() for row in X]
+        scores: List[Optional[float]] = [cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        
+        for i, score in enumerate(scores):
+            if score is not None:
+                try:
+                    cache.move_to_end(keys[i])
+                except KeyError:
+                    pass  # Evicted by a concurrent caller; the score is still valid
+        
+        if missing:
+            rows = X if len(missing) == len(keys) else X[missing]
+            predicted = np.asarray(self._predict_scores(rows), dtype=np.float64)
+            np.round(predicted, 1, out=predicted)
+            np.clip(predicted, 0, 100, out=predicted)
+            
+            for i, score in zip(missing, predicted.tolist()):
+                scores[i] = score
+                cache[keys[i]] = score
+            while len(cache) > self.PREDICTION_CACHE_SIZE:
+                cache.popitem(last=False)
+        
+        return scores
+    
     def _ml_score(self, features: SecretFeatures) -> float:
         """Score using trained ML model"""
         try:
-            feature_vector = np.array([features.to_vector()])
-            
-            # Get probability prediction
-            if hasattr(self.model, 'predict_proba'):
-                # Classification model - use probability of high risk class
-                proba = self.model.predict_proba(feature_vector)[0]
-                # Assume binary classification: 0=low risk, 1=high risk
-                score = proba[-1] * 100 if len(proba) > 1 else proba[0] * 100
-            else:
-                # Regression model - direct score prediction
-                score = self.model.predict(feature_vector)[0]
-            
-            return max(0, min(100, round(score, 1)))
+            feature_vector = np.empty((1, FEATURE_COUNT), dtype=np.float32)
+            features.write_to(feature_vector[0])
+            return self._score_from_vectors(feature_vector)[0]
         except Exception as e:
             self.logger.warning(f"ML scoring failed: {e}. Falling back to heuristic.")
             return self._heuristic_score(features)
@@ -127,15 +303,10 @@ class RiskScorer:
             entropy_contrib = min(features.entropy / 5.0, 1.0) * self.HEURISTIC_WEIGHTS['entropy']
             score += entropy_contrib
         
-        # Add secret type contributions
-        feature_dict = features.to_dict()
-        for key, weight in self.HEURISTIC_WEIGHTS.items():
-            if key in feature_dict:
-                value = feature_dict[key]
-                if isinstance(value, bool) and value:
-                    score += weight
-                elif isinstance(value, (int, float)) and key == 'repo_sensitivity_score':
-                    score += value * 20  # Scale to 0-20 contribution
+        # Add secret type contributions (only genuine True flags count)
+        for get, weight in self._flag_getters:
+            if get(features) is True:
+                score += weight
         
         # Additional adjustments
         if features.confidence_score < 0.7:
@@ -150,32 +321,48 @@ class RiskScorer:
         """Score multiple secrets efficiently"""
         if self.model is not None:
             try:
-                feature_vectors = np.array([f.to_vector() for f in features_list])
-                
-                if hasattr(self.model, 'predict_proba'):
-                    probas = self.model.predict_proba(feature_vectors)
-                    scores = [p[-1] * 100 if len(p) > 1 else p[0] * 100 for p in probas]
-                else:
-                    scores = self.model.predict(feature_vectors).tolist()
+                feature_vectors = np.empty((len(features_list), FEATURE_COUNT), dtype=np.float32)
+                for row, f in zip(feature_vectors, features_list):
+                    f.write_to(row)
                 
-                return [max(0, min(100, round(s, 1))) for s in scores]
+                return self._score_from_vectors(feature_vectors)
             except Exception as e:
                 self.logger.warning(f"Batch ML scoring failed: {e}")
         
-        return [self._heuristic_score(f) for f in features_list]
+        return self._heuristic_score_batch(features_list)
+    
+    def _heuristic_score_batch(self, features_list: List[SecretFeatures]) -> List[float]:
+        """Vectorized _heuristic_score over a batch of secrets"""
+        n = len(features_list)
+        if n == 0:
+            return []
+        
+        # Only genuine True flags contribute, matching _heuristic_score
+        flags = np.fromiter(
+            (getattr(f, k) is True for f in features_list for k in self._flag_keys),
+            dtype=np.float64,
+            count=n * len(self._flag_keys)
+        ).reshape(n, -1)
+        entropy = np.fromiter((f.entropy for f in features_list), dtype=np.float64, count=n)
+        confidence = np.fromiter((f.confidence_score for f in features_list), dtype=np.float64, count=n)
+        exposed = np.fromiter((f.time_exposed_hours for f in features_list), dtype=np.float64, count=n)
+        
+        scores = 30.0 + flags @ self._flag_weights
+        scores += np.where(
+            entropy > 0,
+            np.minimum(entropy / 5.0, 1.0) * self.HEURISTIC_WEIGHTS['entropy'],
+            0.0
+        )
+        scores = np.where(confidence < 0.7, scores * 0.8, scores)
+        scores += np.where(exposed > 24 * 7, 10.0, 0.0)
+        
+        np.round(scores, 1, out=scores)
+        np.clip(scores, 0, 100, out=scores)
+        return scores.tolist()
     
     def get_risk_level(self, score: float) -> str:
         """Convert numeric score to risk level"""
-        if score >= self.RISK_THRESHOLDS['critical']:
-            return 'critical'
-        elif score >= self.RISK_THRESHOLDS['high']:
-            return 'high'
-        elif score >= self.RISK_THRESHOLDS['medium']:
-            return 'medium'
-        elif score >= self.RISK_THRESHOLDS['low']:
-            return 'low'
-        else:
-            return 'info'
+        return self._risk_levels[bisect_right(self._risk_bounds, score)]
     
     def score_and_classify(
         self,
@@ -202,34 +389,15 @@ class RiskScorer:
         risk_level: str
     ) -> Dict[str, Any]:
         """Generate human-readable explanation for the risk score"""
-        factors = []
-        
         # Identify top contributing factors
-        if features.is_aws_key:
-            factors.append({"factor": "AWS Key Type", "impact": "high", "description": "AWS credentials have high blast radius"})
-        if features.is_private_key:
-            factors.append({"factor": "Private Key", "impact": "critical", "description": "Private keys should never be committed"})
-        if features.repo_is_public:
-            factors.append({"factor": "Public Repository", "impact": "high", "description": "Secret is exposed in public repo"})
-        if features.is_production_file:
-            factors.append({"factor": "Production File", "impact": "high", "description": "Located in production configuration"})
-        if features.is_hardcoded:
-            factors.append({"factor": "Hardcoded Value", "impact": "medium", "description": "Value appears to be hardcoded"})
-        if features.entropy > 4.0:
-            factors.append({"factor": "High Entropy", "impact": "medium", "description": f"Entropy: {features.entropy:.2f} bits"})
-        if features.is_test_file:
-            factors.append({"factor": "Test File", "impact": "low", "description": "Located in test file (reduced risk)"})
-        if features.is_example_file:
-            factors.append({"factor": "Example File", "impact": "low", "description": "Appears to be example/sample"})
-        if features.time_exposed_hours > 24 * 30:
-            factors.append({"factor": "Long Exposure", "impact": "high", "description": f"Exposed for {int(features.time_exposed_hours / 24)} days"})
+        factors = [describe(features) for applies, describe in _EXPLAIN_RULES if applies(features)]
         
         return {
             "score": score,
             "risk_level": risk_level,
             "factors": factors,
             "model_type": "ml" if self.model else "heuristic",
-            "feature_count": len(features.to_vector()),
+            "feature_count": FEATURE_COUNT,
         }
     
     def calculate_business_impact(
@@ -251,43 +419,80 @@ class RiskScorer:
         Returns:
             Business impact assessment
         """
-        impact_multipliers = {
-            'public': 1.5,
-            'internal': 1.0,
-            'confidential': 1.3,
-            'restricted': 1.5,
-        }
-        
-        data_multipliers = {
-            'public': 0.8,
-            'internal': 1.0,
-            'confidential': 1.3,
-            'restricted': 1.5,
-        }
-        
-        repo_mult = impact_multipliers.get(repo_type, 1.0)
-        data_mult = data_multipliers.get(data_classification, 1.0)
+        repo_mult = self.REPO_IMPACT_MULTIPLIERS.get(repo_type, 1.0)
+        data_mult = self.DATA_IMPACT_MULTIPLIERS.get(data_classification, 1.0)
         
         business_score = min(100, base_score * repo_mult * data_mult)
         
-        # Calculate potential blast radius
-        blast_radius = "low"
-        if features.is_aws_key or features.is_private_key:
-            blast_radius = "critical"
-        elif features.is_database_url or features.is_google_key:
-            blast_radius = "high"
-        elif features.is_api_key:
-            blast_radius = "medium"
-        
         return {
             "business_impact_score": round(business_score, 1),
-            "blast_radius": blast_radius,
+            "blast_radius": self._blast_radius(features),
             "repo_classification": repo_type,
             "data_classification": data_classification,
             "remediation_priority": self.get_risk_level(business_score),
             "estimated_remediation_time": self._estimate_remediation_time(features),
         }
     
+    def calculate_business_impact_batch(
+        self,
+        features_list: List[SecretFeatures],
+        base_scores: List[float],
+        repo_types: List[str],
+        data_classifications: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Vectorized calculate_business_impact over the findings of a scan.
+        
+        Args:
+            features_list: Secret features, one per finding
+            base_scores: Base risk scores, aligned with features_list
+            repo_types: Repository classifications, aligned with features_list
+            data_classifications: Data sensitivity levels, aligned with features_list
+            
+        Returns:
+            Business impact assessments in input order
+        """
+        n = len(features_list)
+        if n == 0:
+            return []
+        
+        repo_lut = self.REPO_IMPACT_MULTIPLIERS
+        data_lut = self.DATA_IMPACT_MULTIPLIERS
+        business = np.fromiter(base_scores, dtype=np.float64, count=n)
+        business *= np.fromiter((repo_lut.get(r, 1.0) for r in repo_types), dtype=np.float64, count=n)
+        business *= np.fromiter((data_lut.get(d, 1.0) for d in data_classifications), dtype=np.float64, count=n)
+        np.minimum(business, 100, out=business)
+        
+        # Same lookup as get_risk_level, for the whole batch at once
+        level_idx = np.searchsorted(self._risk_bounds, business, side='right')
+        levels = [self._risk_levels[i] for i in level_idx.tolist()]
+        
+        return [
+            {
+                "business_impact_score": score,
+                "blast_radius": self._blast_radius(features),
+                "repo_classification": repo_type,
+                "data_classification": data_classification,
+                "remediation_priority": level,
+                "estimated_remediation_time": self._estimate_remediation_time(features),
+            }
+            for features, score, repo_type, data_classification, level in zip(
+                features_list, [round(b, 1) for b in business.tolist()], repo_types,
+                data_classifications, levels
+            )
+        ]
+    
+    @staticmethod
+    def _blast_radius(features: SecretFeatures) -> str:
+        """Potential blast radius of a leaked secret based on its type"""
+        if features.is_aws_key or features.is_private_key:
+            return "critical"
+        elif features.is_database_url or features.is_google_key:
+            return "high"
+        elif features.is_api_key:
+            return "medium"
+        return "low"
+    
     def _estimate_remediation_time(self, features: SecretFeatures) -> str:
         """Estimate time needed to remediate based on secret type"""
         if features.is_private_key:
@@ -306,11 +511,15 @@ class RiskScorer:
 
 # Global scorer instance (singleton pattern)
 _scorer_instance: Optional[RiskScorer] = None
+_scorer_lock = threading.Lock()
 
 
 def get_risk_scorer() -> RiskScorer:
     """Get or create the global risk scorer instance"""
     global _scorer_instance
     if _scorer_instance is None:
-        _scorer_instance = RiskScorer()
+        # Double-checked so concurrent first requests load the model only once
+        with _scorer_lock:
+            if _scorer_instance is None:
+                _scorer_instance = RiskScorer()
     return _scorer_instance
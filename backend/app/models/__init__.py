@@ -7,6 +7,7 @@ from app.models.repository import Repository, RepositoryType, RepositoryStatus
 from app.models.scan import Scan, ScanStatus, ScanTrigger
 from app.models.secret import Secret, SecretType, RiskLevel, SecretStatus
 from app.models.alert import Alert, AlertType, AlertSeverity, AlertChannel
+from app.models.environment import Environment
 
 __all__ = [
     # Models
@@ -15,6 +16,7 @@ __all__ = [
     "Scan",
     "Secret",
     "Alert",
+    "Environment",
     # Enums
     "UserRole",
     "RepositoryType",
@@ -4,11 +4,11 @@ Vault Sentry - Alert Model
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, Boolean, Enum as SQLEnum, JSON
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, ValueEnum, row_serializer
 
 
 class AlertType(str, enum.Enum):
@@ -41,21 +41,26 @@ class Alert(Base):
     """Alert model for notifications"""
     
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Per-user unread counts/lists and newest-first listing
+        Index("ix_alerts_user_unread", "user_id", "is_read"),
+        Index("ix_alerts_user_created", "user_id", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     alert_id: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
     
     # User reference
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Alert details
     type: Mapped[str] = mapped_column(
-        SQLEnum(AlertType, values_callable=lambda obj: [e.value for e in obj]),
+        ValueEnum(AlertType),
         default=AlertType.SECRET_DETECTED.value,
         index=True
     )
     severity: Mapped[str] = mapped_column(
-        SQLEnum(AlertSeverity, values_callable=lambda obj: [e.value for e in obj]),
+        ValueEnum(AlertSeverity),
         default=AlertSeverity.INFO.value
     )
     
@@ -64,15 +69,15 @@ class Alert(Base):
     message: Mapped[str] = mapped_column(Text, nullable=False)
     
     # Related entities
-    repository_id: Mapped[Optional[int]] = mapped_column(ForeignKey("repositories.id"))
+    repository_id: Mapped[Optional[int]] = mapped_column(ForeignKey("repositories.id", ondelete="SET NULL"))
     scan_id: Mapped[Optional[int]] = mapped_column(Integer)
     secret_id: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Extra data
-    extra_data: Mapped[Optional[dict]] = mapped_column(JSON)
+    extra_data: Mapped[Optional[dict]] = mapped_column(JSONDocument)
     
     # Notification status
-    channels: Mapped[Optional[list]] = mapped_column(JSON)  # List of channels notified
+    channels: Mapped[Optional[list]] = mapped_column(JSONDocument)  # List of channels notified
     is_read: Mapped[bool] = mapped_column(Boolean, default=False)
     is_dismissed: Mapped[bool] = mapped_column(Boolean, default=False)
     
@@ -96,20 +101,17 @@ class Alert(Base):
     
     def to_dict(self) -> dict:
         """Convert alert to dictionary"""
-        return {
-            "id": self.id,
-            "alert_id": self.alert_id,
-            "user_id": self.user_id,
-            "type": self.type,
-            "severity": self.severity,
-            "title": self.title,
-            "message": self.message,
-            "repository_id": self.repository_id,
-            "scan_id": self.scan_id,
-            "secret_id": self.secret_id,
-            "extra_data": self.extra_data,
-            "is_read": self.is_read,
-            "is_dismissed": self.is_dismissed,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "read_at": self.read_at.isoformat() if self.read_at else None
-        }
+        return _alert_to_dict(self)
+
+
+_alert_to_dict = row_serializer(
+    Alert,
+    (
+        "id", "alert_id", "user_id", "type", "severity", "title", "message",
+        "repository_id", "scan_id", "secret_id", "extra_data", "is_read",
+        "is_dismissed", "created_at", "read_at",
+    ),
+    datetimes=(
+        "created_at", "read_at",
+    ),
+)
@@ -0,0 +1,41 @@
+"""
+Vault Sentry - Environment Lookup Model
+"""
+
+from typing import Dict
+from sqlalchemy import SmallInteger, String, event, insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+# Fixed ids for the deployment environments a finding can belong to. The
+# table is seeded from this mapping when it is created, so names resolve
+# in-process without a query or a join.
+ENVIRONMENTS: Dict[int, str] = {
+    1: "production",
+    2: "staging",
+    3: "development",
+    4: "test",
+}
+ENVIRONMENT_IDS: Dict[str, int] = {name: id_ for id_, name in ENVIRONMENTS.items()}
+
+
+class Environment(Base):
+    """Deployment environment referenced by findings through a smallint key"""
+
+    __tablename__ = "environments"
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(32), unique=True, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Environment {self.name}>"
+
+
+@event.listens_for(Environment.__table__, "after_create")
+def _seed_environments(target, connection, **kw) -> None:
+    connection.execute(
+        insert(target),
+        [{"id": id_, "name": name} for id_, name in ENVIRONMENTS.items()],
+    )
@@ -5,11 +5,11 @@ Enhanced with criticality tiers, environment mapping, and team assignment.
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from sqlalchemy import String, Boolean, DateTime, Integer, ForeignKey, Text, Float, Enum as SQLEnum, JSON
+from sqlalchemy import String, Boolean, DateTime, Integer, ForeignKey, Text, Float
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, ValueEnum, row_serializer
 
 
 class RepositoryType(str, enum.Enum):
@@ -52,7 +52,7 @@ class Repository(Base):
     
     # Repository source
     type: Mapped[str] = mapped_column(
-        SQLEnum(RepositoryType, values_callable=lambda obj: [e.value for e in obj]),
+        ValueEnum(RepositoryType),
         default=RepositoryType.GITHUB.value
     )
     url: Mapped[Optional[str]] = mapped_column(String(1000))
@@ -61,7 +61,7 @@ class Repository(Base):
     
     # Status
     status: Mapped[str] = mapped_column(
-        SQLEnum(RepositoryStatus, values_callable=lambda obj: [e.value for e in obj]),
+        ValueEnum(RepositoryStatus),
         default=RepositoryStatus.PENDING.value
     )
     
@@ -72,7 +72,7 @@ class Repository(Base):
     
     # Criticality and environment
     criticality_tier: Mapped[str] = mapped_column(
-        SQLEnum(CriticalityTier, values_callable=lambda obj: [e.value for e in obj]),
+        ValueEnum(CriticalityTier),
         default=CriticalityTier.TIER_4.value
     )
     environment: Mapped[Optional[str]] = mapped_column(String(50))  # production, staging, development
@@ -80,7 +80,7 @@ class Repository(Base):
     
     # Team assignment
     assigned_team: Mapped[Optional[str]] = mapped_column(String(255))
-    team_lead_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
+    team_lead_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     
     # Risk aggregation
     risk_score: Mapped[float] = mapped_column(Float, default=0.0)  # Aggregate risk 0-100
@@ -102,10 +102,10 @@ class Repository(Base):
     jira_project_key: Mapped[Optional[str]] = mapped_column(String(20))
     
     # Metadata JSON for extensibility (renamed from 'metadata' which is reserved in SQLAlchemy)
-    meta_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+    meta_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONDocument)
     
     # Owner
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
@@ -119,11 +119,13 @@ class Repository(Base):
     )
     
     # Relationships
-    owner: Mapped["User"] = relationship("User", back_populates="repositories")
+    # owner_id, not team_lead_id, links a repository to its owning user
+    owner: Mapped["User"] = relationship("User", foreign_keys=[owner_id], back_populates="repositories")
     scans: Mapped[List["Scan"]] = relationship(
         "Scan",
         back_populates="repository",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     
     def __repr__(self) -> str:
@@ -131,27 +133,20 @@ class Repository(Base):
     
     def to_dict(self) -> dict:
         """Convert repository to dictionary"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "full_name": self.full_name,
-            "description": self.description,
-            "type": self.type,
-            "url": self.url,
-            "default_branch": self.default_branch,
-            "status": self.status,
-            "is_private": self.is_private,
-            "auto_scan": self.auto_scan,
-            "criticality_tier": self.criticality_tier,
-            "environment": self.environment,
-            "data_classification": self.data_classification,
-            "assigned_team": self.assigned_team,
-            "risk_score": self.risk_score,
-            "open_findings_count": self.open_findings_count,
-            "critical_findings_count": self.critical_findings_count,
-            "total_scans": self.total_scans,
-            "secrets_found": self.secrets_found,
-            "last_scan_at": self.last_scan_at.isoformat() if self.last_scan_at else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "metadata": self.meta_data,
-        }
+        return _repository_to_dict(self)
+
+
+_repository_to_dict = row_serializer(
+    Repository,
+    (
+        "id", "name", "full_name", "description", "type", "url",
+        "default_branch", "status", "is_private", "auto_scan",
+        "criticality_tier", "environment", "data_classification",
+        "assigned_team", "risk_score", "open_findings_count",
+        "critical_findings_count", "total_scans", "secrets_found",
+        "last_scan_at", "created_at", ("metadata", "meta_data"),
+    ),
+    datetimes=(
+        "last_scan_at", "created_at",
+    ),
+)
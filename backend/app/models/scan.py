@@ -5,11 +5,11 @@ Enhanced with external scanner support and ML scoring.
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, Float, Enum as SQLEnum, JSON, Boolean
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, Float, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, ValueEnum, row_serializer
 
 
 class ScanStatus(str, enum.Enum):
@@ -36,29 +36,33 @@ class Scan(Base):
     """Scan model for tracking repository scans"""
     
     __tablename__ = "scans"
+    __table_args__ = (
+        # Scan lists filtered by repository/status, ordered by creation time
+        Index("ix_scans_repo_status_created", "repository_id", "status", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     scan_id: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
     
     # Scan target
-    repository_id: Mapped[Optional[int]] = mapped_column(ForeignKey("repositories.id"))
+    repository_id: Mapped[Optional[int]] = mapped_column(ForeignKey("repositories.id", ondelete="CASCADE"))
     target_path: Mapped[Optional[str]] = mapped_column(String(1000))
     branch: Mapped[Optional[str]] = mapped_column(String(100))
     commit_hash: Mapped[Optional[str]] = mapped_column(String(64))
     
     # User who initiated
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Scan configuration
     trigger: Mapped[str] = mapped_column(
-        SQLEnum(ScanTrigger, values_callable=lambda obj: [e.value for e in obj]),
+        ValueEnum(ScanTrigger),
         default=ScanTrigger.MANUAL.value
     )
-    scan_config: Mapped[Optional[dict]] = mapped_column(JSON)  # Custom scan rules
+    scan_config: Mapped[Optional[dict]] = mapped_column(JSONDocument)  # Custom scan rules
     
     # Status
     status: Mapped[str] = mapped_column(
-        SQLEnum(ScanStatus, values_callable=lambda obj: [e.value for e in obj]),
+        ValueEnum(ScanStatus),
         default=ScanStatus.PENDING.value
     )
     progress: Mapped[int] = mapped_column(Integer, default=0)  # 0-100
@@ -79,8 +83,8 @@ class Scan(Base):
     duration_seconds: Mapped[Optional[float]] = mapped_column(Float)
     
     # Scanner information
-    scanners_used: Mapped[Optional[List[str]]] = mapped_column(JSON)  # ['builtin', 'trufflehog', 'gitleaks']
-    scanner_versions: Mapped[Optional[Dict[str, str]]] = mapped_column(JSON)
+    scanners_used: Mapped[Optional[List[str]]] = mapped_column(JSONDocument)  # ['builtin', 'trufflehog', 'gitleaks']
+    scanner_versions: Mapped[Optional[Dict[str, str]]] = mapped_column(JSONDocument)
     
     # ML scoring
     ml_scored: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -92,7 +96,7 @@ class Scan(Base):
     check_run_id: Mapped[Optional[int]] = mapped_column(Integer)  # GitHub Check Run ID
     
     # Metadata for extensibility (renamed from 'metadata' which is reserved in SQLAlchemy)
-    meta_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+    meta_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONDocument)
     
     # Error handling
     error_message: Mapped[Optional[str]] = mapped_column(Text)
@@ -112,7 +116,8 @@ class Scan(Base):
     secrets: Mapped[List["Secret"]] = relationship(
         "Secret",
         back_populates="scan",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     
     def __repr__(self) -> str:
@@ -120,25 +125,19 @@ class Scan(Base):
     
     def to_dict(self) -> dict:
         """Convert scan to dictionary"""
-        return {
-            "id": self.id,
-            "scan_id": self.scan_id,
-            "repository_id": self.repository_id,
-            "target_path": self.target_path,
-            "branch": self.branch,
-            "commit_hash": self.commit_hash,
-            "trigger": self.trigger,
-            "status": self.status,
-            "progress": self.progress,
-            "files_scanned": self.files_scanned,
-            "total_findings": self.total_findings,
-            "high_risk_count": self.high_risk_count,
-            "medium_risk_count": self.medium_risk_count,
-            "low_risk_count": self.low_risk_count,
-            "risk_score": self.risk_score,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "duration_seconds": self.duration_seconds,
-            "error_message": self.error_message,
-            "created_at": self.created_at.isoformat() if self.created_at else None
-        }
+        return _scan_to_dict(self)
+
+
+_scan_to_dict = row_serializer(
+    Scan,
+    (
+        "id", "scan_id", "repository_id", "target_path", "branch",
+        "commit_hash", "trigger", "status", "progress", "files_scanned",
+        "total_findings", "high_risk_count", "medium_risk_count",
+        "low_risk_count", "risk_score", "started_at", "completed_at",
+        "duration_seconds", "error_message", "created_at",
+    ),
+    datetimes=(
+        "started_at", "completed_at", "created_at",
+    ),
+)
@@ -4,12 +4,14 @@ Enhanced with ML scoring, lifecycle tracking, and business impact assessment.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, Float, Boolean, Enum as SQLEnum, JSON
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from sqlalchemy import String, DateTime, Integer, SmallInteger, ForeignKey, Text, Float, Boolean, LargeBinary, Index, UniqueConstraint, Computed, case, text
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, JSONDocument, dialect_insert, enum_value, row_serializer
+from app.models.environment import ENVIRONMENTS, ENVIRONMENT_IDS
 
 
 class SecretType(str, enum.Enum):
@@ -51,22 +53,82 @@ class SecretStatus(str, enum.Enum):
     IGNORED = "ignored"
 
 
+# Priority multiplier by deployment environment
+_ENV_MULTIPLIERS = {
+    'production': 1.5,
+    'staging': 1.2,
+    'development': 1.0,
+    'test': 0.5,
+}
+_ENV_MULTIPLIER_SQL = "".join(
+    f" WHEN {ENVIRONMENT_IDS[name]} THEN {multiplier}"
+    for name, multiplier in _ENV_MULTIPLIERS.items()
+    if multiplier != 1.0
+)
+
+# calculate_priority() as portable SQL (PostgreSQL and SQLite): FLOOR mirrors
+# int() on the non-negative terms, CASE stands in for min()/max()
+_PRIORITY_BASE_SQL = (
+    "FLOOR(("
+    "50 + FLOOR(COALESCE(NULLIF(risk_score, 0), 50) * 0.3)"
+    " + FLOOR(COALESCE(NULLIF(business_impact_score, 0), 50) * 0.2)"
+    f") * CASE environment_id{_ENV_MULTIPLIER_SQL} ELSE 1.0 END)"
+    " + CASE WHEN days_open > 30"
+    " THEN CASE WHEN days_open / 10 > 20 THEN 20 ELSE days_open / 10 END"
+    " ELSE 0 END"
+)
+_PRIORITY_SQL = (
+    f"CASE WHEN {_PRIORITY_BASE_SQL} < 1 THEN 1"
+    f" WHEN {_PRIORITY_BASE_SQL} > 100 THEN 100"
+    f" ELSE {_PRIORITY_BASE_SQL} END"
+)
+
+
 class Secret(Base):
     """Secret model for storing detected secrets/findings"""
     
     __tablename__ = "secrets"
+    __table_args__ = (
+        # The scanner reports each distinct secret once per scan; ingest
+        # upserts against this key (see finding_upsert)
+        UniqueConstraint("scan_id", "secret_hash", name="uq_secrets_scan_hash"),
+        # Findings are reached through their scan, then filtered by status and
+        # risk level and ordered by risk score
+        Index("ix_secrets_scan_status_risk", "scan_id", "status", "risk_level", "risk_score"),
+        # Partial indexes over the open findings only
+        Index(
+            "ix_secrets_open_by_detected",
+            "status",
+            "first_detected_at",
+            postgresql_where=text("status = 'open'"),
+            sqlite_where=text("status = 'open'"),
+        ),
+        Index(
+            "ix_secrets_assigned_open",
+            "assigned_user_id",
+            "status",
+            postgresql_where=text("status IN ('open', 'in_progress')"),
+            sqlite_where=text("status IN ('open', 'in_progress')"),
+        ),
+        # Index-backed JSONB containment (meta_data @> ...) on PostgreSQL only
+        Index(
+            "ix_secrets_meta_gin",
+            "meta_data",
+            postgresql_using="gin",
+            postgresql_ops={"meta_data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     finding_id: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
     
     # Scan reference
-    scan_id: Mapped[int] = mapped_column(ForeignKey("scans.id"), nullable=False)
+    scan_id: Mapped[int] = mapped_column(ForeignKey("scans.id", ondelete="CASCADE"), nullable=False)
     
     # Secret details
     type: Mapped[str] = mapped_column(
-        SQLEnum(SecretType, values_callable=lambda obj: [e.value for e in obj]),
-        default=SecretType.GENERIC_SECRET.value,
-        index=True
+        String(32),
+        default=SecretType.GENERIC_SECRET.value
     )
     
     # Location
@@ -77,7 +139,7 @@ class Secret(Base):
     
     # Content (masked/truncated for security)
     secret_value_masked: Mapped[str] = mapped_column(Text, nullable=False)  # e.g., "AKIA****WXYZ"
-    secret_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA256 hash for deduplication
+    secret_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False)  # Raw SHA256 digest for deduplication
     
     # Context
     code_snippet: Mapped[Optional[str]] = mapped_column(Text)  # Surrounding code context
@@ -85,9 +147,8 @@ class Secret(Base):
     
     # Risk assessment
     risk_level: Mapped[str] = mapped_column(
-        SQLEnum(RiskLevel, values_callable=lambda obj: [e.value for e in obj]),
-        default=RiskLevel.MEDIUM.value,
-        index=True
+        String(16),
+        default=RiskLevel.MEDIUM.value
     )
     risk_score: Mapped[float] = mapped_column(Float, default=50.0)  # 0-100
     
@@ -102,7 +163,8 @@ class Secret(Base):
     business_impact_score: Mapped[float] = mapped_column(Float, default=50.0)  # Business impact 0-100
     
     # Environment and context
-    environment: Mapped[Optional[str]] = mapped_column(String(50))  # production, staging, development, test
+    # Exposed by name through the environment hybrid below
+    environment_id: Mapped[Optional[int]] = mapped_column(SmallInteger, ForeignKey("environments.id"))
     branch: Mapped[Optional[str]] = mapped_column(String(255))
     commit_hash: Mapped[Optional[str]] = mapped_column(String(64))
     commit_author: Mapped[Optional[str]] = mapped_column(String(255))
@@ -110,11 +172,18 @@ class Secret(Base):
     
     # Assignment and workflow
     assigned_team: Mapped[Optional[str]] = mapped_column(String(255))
-    assigned_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
+    assigned_user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     priority: Mapped[int] = mapped_column(Integer, default=50)  # 1-100, higher = more urgent
+    # calculate_priority() maintained by the database, so ranking queries can
+    # ORDER BY it through an index instead of scoring rows in Python
+    computed_priority: Mapped[int] = mapped_column(
+        Integer,
+        Computed(_PRIORITY_SQL, persisted=True),
+        index=True
+    )
     sla_due_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     acknowledged_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
-    acknowledged_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
+    acknowledged_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     
     # Lifecycle tracking
     days_open: Mapped[int] = mapped_column(Integer, default=0)
@@ -129,17 +198,16 @@ class Secret(Base):
     pr_number: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Metadata JSON for extensibility (renamed from 'metadata' which is reserved in SQLAlchemy)
-    meta_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+    meta_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONDocument)
     
     # Status
     status: Mapped[str] = mapped_column(
-        SQLEnum(SecretStatus, values_callable=lambda obj: [e.value for e in obj]),
-        default=SecretStatus.OPEN.value,
-        index=True
+        String(32),
+        default=SecretStatus.OPEN.value
     )
     
     # Remediation
-    resolved_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
+    resolved_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     resolution_notes: Mapped[Optional[str]] = mapped_column(Text)
     
@@ -153,54 +221,46 @@ class Secret(Base):
         default=datetime.utcnow
     )
     
-    # Relationships
-    scan: Mapped["Scan"] = relationship("Scan", back_populates="secrets")
+    # Relationships (never lazy-loaded: callers that need them must use
+    # selectinload/joinedload so list queries cannot fan out into N+1)
+    scan: Mapped["Scan"] = relationship("Scan", back_populates="secrets", lazy="raise")
     assigned_user: Mapped[Optional["User"]] = relationship(
         "User", 
         foreign_keys=[assigned_user_id],
-        backref="assigned_secrets"
+        back_populates="assigned_secrets",
+        lazy="raise"
     )
     
+    @hybrid_property
+    def environment(self) -> Optional[str]:
+        """Environment name (production, staging, development, test)"""
+        return ENVIRONMENTS.get(self.environment_id)
+    
+    @environment.inplace.setter
+    def _environment_setter(self, value: Optional[str]) -> None:
+        if not value:
+            self.environment_id = None
+            return
+        environment_id = ENVIRONMENT_IDS.get(value.lower())
+        if environment_id is None:
+            raise ValueError(f"Invalid environment: {value!r}")
+        self.environment_id = environment_id
+    
+    @environment.inplace.expression
+    @classmethod
+    def _environment_expression(cls):
+        return case(ENVIRONMENTS, value=cls.environment_id)
+    
+    @validates("type", "risk_level", "status")
+    def _validate_enum_columns(self, key: str, value: Any) -> Optional[str]:
+        return enum_value(_SECRET_ENUM_COLUMNS[key], key, value)
+    
     def __repr__(self) -> str:
         return f"<Secret {self.type} in {self.file_path}:{self.line_number}>"
     
     def to_dict(self) -> dict:
         """Convert secret to dictionary"""
-        return {
-            "id": self.id,
-            "finding_id": self.finding_id,
-            "scan_id": self.scan_id,
-            "type": self.type,
-            "file_path": self.file_path,
-            "line_number": self.line_number,
-            "secret_value_masked": self.secret_value_masked,
-            "code_snippet": self.code_snippet,
-            "match_rule": self.match_rule,
-            "risk_level": self.risk_level,
-            "risk_score": self.risk_score,
-            "ml_risk_score": self.ml_risk_score,
-            "entropy_score": self.entropy_score,
-            "confidence": self.confidence,
-            "business_impact_score": self.business_impact_score,
-            "environment": self.environment,
-            "branch": self.branch,
-            "commit_hash": self.commit_hash,
-            "assigned_team": self.assigned_team,
-            "assigned_user_id": self.assigned_user_id,
-            "priority": self.priority,
-            "sla_due_at": self.sla_due_at.isoformat() if self.sla_due_at else None,
-            "days_open": self.days_open,
-            "rotation_count": self.rotation_count,
-            "is_test_file": self.is_test_file,
-            "status": self.status,
-            "jira_issue_key": self.jira_issue_key,
-            "pr_number": self.pr_number,
-            "first_detected_at": self.first_detected_at.isoformat() if self.first_detected_at else None,
-            "last_seen_at": self.last_seen_at.isoformat() if self.last_seen_at else None,
-            "acknowledged_at": self.acknowledged_at.isoformat() if self.acknowledged_at else None,
-            "resolved_at": self.resolved_at.isoformat() if self.resolved_at else None,
-            "metadata": self.meta_data,
-        }
+        return _secret_to_dict(self)
     
     def calculate_priority(self) -> int:
         """Calculate dynamic priority based on multiple factors"""
@@ -213,14 +273,8 @@ class Secret(Base):
         priority += int((self.business_impact_score or 50) * 0.2)
         
         # Environment multiplier
-        env_multipliers = {
-            'production': 1.5,
-            'staging': 1.2,
-            'development': 1.0,
-            'test': 0.5,
-        }
         if self.environment:
-            priority = int(priority * env_multipliers.get(self.environment.lower(), 1.0))
+            priority = int(priority * _ENV_MULTIPLIERS.get(self.environment, 1.0))
         
         # Aging factor (older secrets get higher priority)
         if self.days_open > 30:
@@ -228,3 +282,80 @@ class Secret(Base):
         
         return min(max(priority, 1), 100)
 
+
+def finding_upsert():
+    """
+    Bulk INSERT for scan findings keyed on (scan_id, secret_hash).
+    
+    A finding already stored for the scan has its last_seen_at refreshed
+    instead of failing the batch, so ingest needs no SELECT before insert.
+    """
+    stmt = dialect_insert(Secret)
+    return stmt.on_conflict_do_update(
+        index_elements=[Secret.scan_id, Secret.secret_hash],
+        set_={"last_seen_at": stmt.excluded.last_seen_at},
+    )
+
+
+def finding_rows(
+    findings: List[Any],
+    scan_id: int,
+    scores: Optional[Iterable[Tuple[str, float]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build Secret insert parameters for a scan's findings.
+    
+    The rows are written with one bulk INSERT (see finding_upsert) instead
+    of adding an ORM object per finding. The scanner's hex digest is stored
+    as its raw 32 bytes. ``scores`` optionally gives a (risk_level,
+    risk_score) pair per finding to store in place of the scanner's own.
+    """
+    if scores is None:
+        scores = ((finding.severity, finding.risk_score) for finding in findings)
+    
+    return [
+        {
+            "finding_id": finding.finding_id,
+            "scan_id": scan_id,
+            "type": finding.type,
+            "file_path": finding.file_path,
+            "line_number": finding.line_number,
+            "column_start": finding.column_start,
+            "column_end": finding.column_end,
+            "secret_value_masked": finding.secret_masked,
+            "secret_hash": bytes.fromhex(finding.secret_hash),
+            "code_snippet": finding.code_snippet,
+            "match_rule": finding.match_rule,
+            "risk_level": risk_level,
+            "risk_score": risk_score,
+            "entropy_score": finding.entropy_score,
+            "is_test_file": finding.is_test_file,
+            "status": SecretStatus.OPEN.value,
+        }
+        for finding, (risk_level, risk_score) in zip(findings, scores)
+    ]
+
+
+_secret_to_dict = row_serializer(
+    Secret,
+    (
+        "id", "finding_id", "scan_id", "type", "file_path", "line_number",
+        "secret_value_masked", "code_snippet", "match_rule", "risk_level",
+        "risk_score", "ml_risk_score", "entropy_score", "confidence",
+        "business_impact_score", "environment", "branch", "commit_hash",
+        "assigned_team", "assigned_user_id", "priority", "sla_due_at",
+        "days_open", "rotation_count", "is_test_file", "status",
+        "jira_issue_key", "pr_number", "first_detected_at", "last_seen_at",
+        "acknowledged_at", "resolved_at", ("metadata", "meta_data"),
+    ),
+    datetimes=(
+        "sla_due_at", "first_detected_at", "last_seen_at", "acknowledged_at",
+        "resolved_at",
+    ),
+)
+
+_SECRET_ENUM_COLUMNS = {
+    "type": SecretType,
+    "risk_level": RiskLevel,
+    "status": SecretStatus,
+}
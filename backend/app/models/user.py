@@ -3,12 +3,18 @@ Vault Sentry - User Model
 """
 
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy import String, Boolean, DateTime, Text, Enum as SQLEnum, Integer
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import TYPE_CHECKING, Any, Optional, List
+from sqlalchemy import String, Boolean, DateTime, Text, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, enum_value, row_serializer
+
+if TYPE_CHECKING:
+    from app.models.alert import Alert
+    from app.models.repository import Repository
+    from app.models.scan import Scan
+    from app.models.secret import Secret
 
 
 class UserRole(str, enum.Enum):
@@ -37,7 +43,7 @@ class User(Base):
     
     # Role-based access control
     role: Mapped[str] = mapped_column(
-        SQLEnum(UserRole, values_callable=lambda obj: [e.value for e in obj]),
+        String(16),
         default=UserRole.DEVELOPER.value
     )
     
@@ -55,7 +61,7 @@ class User(Base):
     
     # Subscription tier
     subscription_tier: Mapped[str] = mapped_column(
-        SQLEnum(SubscriptionTier, values_callable=lambda obj: [e.value for e in obj]),
+        String(16),
         default=SubscriptionTier.BASIC.value
     )
     subscription_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -84,42 +90,59 @@ class User(Base):
     # Relationships
     repositories: Mapped[List["Repository"]] = relationship(
         "Repository",
+        foreign_keys="Repository.owner_id",
         back_populates="owner",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     scans: Mapped[List["Scan"]] = relationship(
         "Scan",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     alerts: Mapped[List["Alert"]] = relationship(
         "Alert",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+    # Every finding assigned to the user; only loaded when explicitly requested
+    assigned_secrets: Mapped[List["Secret"]] = relationship(
+        "Secret",
+        foreign_keys="Secret.assigned_user_id",
+        back_populates="assigned_user",
+        lazy="raise_on_sql",
+        passive_deletes=True
     )
     
+    @validates("role")
+    def _validate_role(self, key: str, value: Any) -> Optional[str]:
+        return enum_value(UserRole, key, value)
+    
+    @validates("subscription_tier")
+    def _validate_subscription_tier(self, key: str, value: Any) -> Optional[str]:
+        return enum_value(SubscriptionTier, key, value)
+    
     def __repr__(self) -> str:
         return f"<User {self.username} ({self.email})>"
     
     def to_dict(self) -> dict:
         """Convert user to dictionary (excluding sensitive data)"""
-        return {
-            "id": self.id,
-            "email": self.email,
-            "username": self.username,
-            "full_name": self.full_name,
-            "role": self.role,
-            "is_active": self.is_active,
-            "is_verified": self.is_verified,
-            "avatar_url": self.avatar_url,
-            "company": self.company,
-            "subscription_tier": self.subscription_tier,
-            "subscription_started_at": self.subscription_started_at.isoformat() if self.subscription_started_at else None,
-            "subscription_expires_at": self.subscription_expires_at.isoformat() if self.subscription_expires_at else None,
-            "is_trial": self.is_trial,
-            "trial_ends_at": self.trial_ends_at.isoformat() if self.trial_ends_at else None,
-            "scans_this_week": self.scans_this_week,
-            "scans_today": self.scans_today,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "last_login": self.last_login.isoformat() if self.last_login else None
-        }
+        return _user_to_dict(self)
+
+
+_user_to_dict = row_serializer(
+    User,
+    (
+        "id", "email", "username", "full_name", "role", "is_active",
+        "is_verified", "avatar_url", "company", "subscription_tier",
+        "subscription_started_at", "subscription_expires_at", "is_trial",
+        "trial_ends_at", "scans_this_week", "scans_today", "created_at",
+        "last_login",
+    ),
+    datetimes=(
+        "subscription_started_at", "subscription_expires_at", "trial_ends_at",
+        "created_at", "last_login",
+    ),
+)
@@ -2,62 +2,62 @@
 Vault Sentry - Scanner Module
 """
 
-from app.scanner.engine import SecretScanner, Finding, ScanResult, scanner
-from app.scanner.patterns import COMPILED_PATTERNS, ALL_PATTERNS, SecretCategory
-from app.scanner.entropy import (
-    calculate_shannon_entropy,
-    analyze_file_entropy,
-    analyze_line_entropy,
-    EntropyFinding
-)
-from app.scanner.s3_scanner import (
-    S3Scanner,
-    S3ScanConfig,
-    S3ScanResult,
-    S3Object,
-    scan_s3_bucket,
-    s3_scanner
-)
-from app.scanner.env_analyzer import (
-    EnvVarsAnalyzer,
-    EnvVariable,
-    EnvAnalysisResult,
-    env_analyzer,
-    analyze_env_file,
-    analyze_env_content
-)
-
-__all__ = [
+import importlib
+
+# Public name -> defining submodule. Submodules are imported on first
+# attribute access, so e.g. using the env analyzer does not pull in boto3
+# through the S3 scanner. The s3_scanner and env_analyzer instances share
+# their submodule's name: once that submodule has been imported directly,
+# the package attribute is the module, so import the instances from the
+# submodule itself.
+_LAZY = {
     # Core Scanner
-    "SecretScanner",
-    "Finding",
-    "ScanResult",
-    "scanner",
+    "SecretScanner": "app.scanner.engine",
+    "Finding": "app.scanner.engine",
+    "ScanResult": "app.scanner.engine",
+    "scanner": "app.scanner.engine",
     
     # Patterns
-    "COMPILED_PATTERNS",
-    "ALL_PATTERNS",
-    "SecretCategory",
+    "COMPILED_PATTERNS": "app.scanner.patterns",
+    "ALL_PATTERNS": "app.scanner.patterns",
+    "SecretCategory": "app.scanner.patterns",
     
     # Entropy Analysis
-    "calculate_shannon_entropy",
-    "analyze_file_entropy",
-    "analyze_line_entropy",
-    "EntropyFinding",
+    "calculate_shannon_entropy": "app.scanner.entropy",
+    "analyze_file_entropy": "app.scanner.entropy",
+    "analyze_line_entropy": "app.scanner.entropy",
+    "EntropyFinding": "app.scanner.entropy",
     
     # S3 Scanner
-    "S3Scanner",
-    "S3ScanConfig",
-    "S3ScanResult",
-    "S3Object",
-    "scan_s3_bucket",
-    "s3_scanner",
+    "S3Scanner": "app.scanner.s3_scanner",
+    "S3ScanConfig": "app.scanner.s3_scanner",
+    "S3ScanResult": "app.scanner.s3_scanner",
+    "S3Object": "app.scanner.s3_scanner",
+    "scan_s3_bucket": "app.scanner.s3_scanner",
+    "s3_scanner": "app.scanner.s3_scanner",
     
     # Environment Variable Analyzer
-    "EnvVarsAnalyzer",
-    "EnvVariable",
-    "EnvAnalysisResult",
-    "env_analyzer",
-    "analyze_env_file",
-    "analyze_env_content"
-]
+    "EnvVarsAnalyzer": "app.scanner.env_analyzer",
+    "EnvVariable": "app.scanner.env_analyzer",
+    "EnvAnalysisResult": "app.scanner.env_analyzer",
+    "env_analyzer": "app.scanner.env_analyzer",
+    "analyze_env_file": "app.scanner.env_analyzer",
+    "analyze_env_content": "app.scanner.env_analyzer",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+__all__ = list(_LAZY)
@@ -4,24 +4,110 @@ Combines regex patterns, entropy analysis, and keyword scanning
 """
 
 import os
+import re
 import hashlib
+import multiprocessing
+import threading
 import uuid
+from array import array
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, AsyncIterator, Any
 from dataclasses import dataclass, field
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import asyncio
+import numpy as np
 from loguru import logger
 
 from app.scanner.patterns import COMPILED_PATTERNS, SecretCategory
 from app.scanner.entropy import (
     analyze_file_entropy,
     calculate_shannon_entropy,
-    calculate_risk_from_entropy
+    calculate_risk_from_entropy,
+    clear_value_caches,
+    VALUE_CACHE_SIZE
 )
 from app.core.config import settings
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+
+# Context lines around a finding are clipped to this many characters so a
+# minified file cannot put hundreds of kilobytes into one stored snippet
+SNIPPET_CONTEXT_MAX_CHARS = 240
+
+# Hyperscan prefilter over COMPILED_PATTERNS. One pass over a file reports
+# which patterns can match, and only those run through re.finditer, which
+# still produces the groups and non-overlapping matches findings rely on.
+# PREFILTER over-approximates constructs Hyperscan cannot compile exactly,
+# and UTF8/UCP keep \w and case folding Unicode-aware like the str patterns.
+_pattern_database = None
+_pattern_database_failed = False
+_pattern_database_lock = threading.Lock()
+_scan_scratch = threading.local()
+
+
+def _get_pattern_database():
+    """Compile the Hyperscan database once; None if it cannot be built"""
+    global _pattern_database, _pattern_database_failed
+    if _pattern_database is None and not _pattern_database_failed:
+        with _pattern_database_lock:
+            if _pattern_database is None and not _pattern_database_failed:
+                try:
+                    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                    database.compile(
+                        expressions=[p["regex"].pattern.encode() for p in COMPILED_PATTERNS],
+                        ids=list(range(len(COMPILED_PATTERNS))),
+                        elements=len(COMPILED_PATTERNS),
+                        flags=(
+                            hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE
+                            | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+                            | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER
+                        ),
+                    )
+                    _pattern_database = database
+                except Exception as e:
+                    _pattern_database_failed = True
+                    logger.warning(f"Hyperscan prefilter unavailable, using regex only: {e}")
+    return _pattern_database
+
+
+def _record_pattern_hit(pattern_id, start, end, flags, hits):
+    hits.add(pattern_id)
+
+
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
+def _sha256_hex(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+# Below this many files a scan stays on threads: each worker interpreter
+# takes about half a second to start and import the scanner, against
+# roughly a millisecond of regex/entropy work per file
+PROCESS_POOL_MIN_FILES = 500
+
+# Scanner used by scan_file calls inside a process pool worker
+_worker_scanner: Optional["SecretScanner"] = None
+
+
+def _init_scan_worker(scanner_options: Dict[str, Any], pattern_database: Optional[bytes]) -> None:
+    """Process pool initializer: build the worker's scanner once"""
+    global _worker_scanner, _pattern_database
+    if pattern_database is not None:
+        # Reuse the parent's compiled database rather than recompiling
+        _pattern_database = hyperscan.loadb(pattern_database, hyperscan.HS_MODE_BLOCK)
+    _worker_scanner = SecretScanner(**scanner_options)
+
+
+def _scan_file_worker(file_path: Path) -> List["Finding"]:
+    return _worker_scanner.scan_file(file_path)
+
 
 @dataclass
 class Finding:
@@ -65,6 +151,67 @@ class ScanResult:
     errors: List[str] = field(default_factory=list)
 
 
+_NEWLINE = re.compile('\n')
+
+# Skipped as binary regardless of the configured exclusions
+BINARY_EXTENSIONS = frozenset({'.exe', '.dll', '.so', '.dylib', '.bin', '.dat'})
+
+# Risk score inputs: base score by severity, and lowercase path keywords that
+# lower (example/sample/demo) or raise (prod/production/deploy) the score
+SEVERITY_BASE_SCORES = {
+    'critical': 90,
+    'high': 70,
+    'medium': 50,
+    'low': 30
+}
+_EXAMPLE_PATH = re.compile('example|sample|demo')
+_PRODUCTION_PATH = re.compile('prod|production|deploy')
+
+
+class _LineView:
+    """
+    Lines of a file's content, sliced out on demand.
+    
+    Stands in for content.split('\n') so a scanned file is not held twice in
+    memory. Line start offsets are only computed once a finding needs a line
+    number or snippet.
+    """
+    
+    __slots__ = ("_content", "_starts")
+    
+    def __init__(self, content: str):
+        self._content = content
+        self._starts: Optional[array] = None
+    
+    @property
+    def starts(self) -> array:
+        """Offset of each line's first character"""
+        if self._starts is None:
+            content = self._content
+            if content.isascii():
+                # One vectorized pass over the bytes (offsets match for ASCII)
+                newlines = np.flatnonzero(np.frombuffer(content.encode('ascii'), dtype=np.uint8) == 10)
+                starts = array('q', [0])
+                starts.frombytes((newlines + 1).astype(np.int64).tobytes())
+            else:
+                starts = array('q', [0])
+                starts.extend(match.end() for match in _NEWLINE.finditer(content))
+            self._starts = starts
+        return self._starts
+    
+    def line_index(self, offset: int) -> int:
+        """Zero-based index of the line containing a content offset"""
+        return bisect_right(self.starts, offset) - 1
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, index: int) -> str:
+        starts = self.starts
+        end = starts[index + 1] - 1 if index + 1 < len(starts) else len(self._content)
+        return self._content[starts[index]:end]
+
+
 class SecretScanner:
     """
     Main secret scanning engine.
@@ -77,15 +224,23 @@ class SecretScanner:
         excluded_dirs: List[str] = None,
         excluded_extensions: List[str] = None,
         entropy_enabled: bool = True,
-        max_workers: int = 4
+        max_workers: int = 4,
+        executor: str = settings.SCAN_EXECUTOR
     ):
         self.max_file_size = max_file_size
         self.excluded_dirs = set(excluded_dirs or settings.EXCLUDED_DIRS)
         self.excluded_extensions = set(excluded_extensions or settings.EXCLUDED_EXTENSIONS)
         self.entropy_enabled = entropy_enabled
         self.max_workers = max_workers
+        self.executor = executor
         self.patterns = COMPILED_PATTERNS
         
+        # Lowercased once for _should_skip_file
+        self._excluded_dirs_lower = frozenset(d.lower() for d in self.excluded_dirs)
+        self._skipped_extensions = (
+            frozenset(e.lower() for e in self.excluded_extensions) | BINARY_EXTENSIONS
+        )
+        
         # Keywords that indicate sensitive content
         self.sensitive_keywords = {
             'password', 'secret', 'api_key', 'apikey', 'api-key',
@@ -99,32 +254,23 @@ class SecretScanner:
             'test', 'spec', 'mock', 'fake', 'dummy', 'example',
             'sample', 'fixture', '__tests__', '__mocks__'
         }
+        self._test_path_pattern = re.compile(
+            '|'.join(re.escape(indicator) for indicator in sorted(self.test_indicators))
+        )
     
     def _should_skip_file(self, file_path: Path) -> bool:
         """Determine if a file should be skipped"""
-        path_str = str(file_path).lower()
-        
-        # Check excluded directories
-        for excluded in self.excluded_dirs:
-            if excluded.lower() in path_str:
-                return True
-        
-        # Check excluded extensions
-        suffix = file_path.suffix.lower()
-        if suffix in self.excluded_extensions:
-            return True
-        
-        # Skip binary files by extension
-        binary_extensions = {'.exe', '.dll', '.so', '.dylib', '.bin', '.dat'}
-        if suffix in binary_extensions:
+        # Check excluded directories (whole path components, so excluding
+        # "build" does not skip files under "rebuild")
+        if not self._excluded_dirs_lower.isdisjoint(part.lower() for part in file_path.parts[:-1]):
             return True
         
-        return False
+        # Check excluded and binary extensions
+        return file_path.suffix.lower() in self._skipped_extensions
     
     def _is_test_file(self, file_path: str) -> bool:
         """Check if file is likely a test/example file"""
-        path_lower = file_path.lower()
-        return any(indicator in path_lower for indicator in self.test_indicators)
+        return self._test_path_pattern.search(file_path.lower()) is not None
     
     def _mask_secret(self, secret: str, visible_chars: int = 4) -> str:
         """Mask a secret value for safe display"""
@@ -135,11 +281,11 @@ class SecretScanner:
     
     def _hash_secret(self, secret: str) -> str:
         """Create SHA256 hash of secret for deduplication"""
-        return hashlib.sha256(secret.encode()).hexdigest()
+        return _sha256_hex(secret)
     
     def _get_code_snippet(
         self,
-        lines: List[str],
+        lines: _LineView,
         line_number: int,
         context_lines: int = 2
     ) -> str:
@@ -149,8 +295,14 @@ class SecretScanner:
         
         snippet_lines = []
         for i in range(start, end):
-            prefix = ">>> " if i == line_number - 1 else "    "
-            snippet_lines.append(f"{i + 1:4d} {prefix}{lines[i]}")
+            if i == line_number - 1:
+                # The finding's own line is kept whole
+                snippet_lines.append(f"{i + 1:4d} >>> {lines[i]}")
+            else:
+                line = lines[i]
+                if len(line) > SNIPPET_CONTEXT_MAX_CHARS:
+                    line = line[:SNIPPET_CONTEXT_MAX_CHARS] + "..."
+                snippet_lines.append(f"{i + 1:4d}     {line}")
         
         return '\n'.join(snippet_lines)
     
@@ -159,17 +311,12 @@ class SecretScanner:
         severity: str,
         confidence: float,
         is_test_file: bool,
-        file_path: str
+        is_example_path: bool,
+        is_production_path: bool
     ) -> float:
         """Calculate risk score based on multiple factors"""
         # Base score from severity
-        severity_scores = {
-            'critical': 90,
-            'high': 70,
-            'medium': 50,
-            'low': 30
-        }
-        base_score = severity_scores.get(severity, 50)
+        base_score = SEVERITY_BASE_SCORES.get(severity, 50)
         
         # Adjust for confidence
         score = base_score * confidence
@@ -179,25 +326,50 @@ class SecretScanner:
             score *= 0.5
         
         # Reduce score for example/sample files
-        if any(kw in file_path.lower() for kw in ['example', 'sample', 'demo']):
+        if is_example_path:
             score *= 0.6
         
         # Increase score for production-related paths
-        if any(kw in file_path.lower() for kw in ['prod', 'production', 'deploy']):
+        if is_production_path:
             score *= 1.2
         
         return min(100, max(0, round(score, 1)))
     
+    def _candidate_patterns(self, content: str) -> List[Dict]:
+        """Patterns that can match the content (all of them without Hyperscan)"""
+        database = _get_pattern_database() if HYPERSCAN_AVAILABLE else None
+        if database is None:
+            return self.patterns
+        try:
+            data = content.encode("utf-8")
+        except UnicodeEncodeError:
+            return self.patterns
+        
+        # Scratch space is per thread; files are scanned from a thread pool
+        scratch = getattr(_scan_scratch, "scratch", None)
+        if scratch is None:
+            scratch = _scan_scratch.scratch = hyperscan.Scratch(database)
+        
+        hits = set()
+        database.scan(data, match_event_handler=_record_pattern_hit, context=hits, scratch=scratch)
+        return [self.patterns[i] for i in sorted(hits)]
+    
     def _scan_content_patterns(
         self,
         content: str,
         file_path: str,
-        lines: List[str]
+        lines: _LineView
     ) -> List[Finding]:
         """Scan content using regex patterns"""
         findings = []
         
-        for pattern_info in self.patterns:
+        # Path-derived risk inputs are the same for every match in the file
+        is_test = self._is_test_file(file_path)
+        path_lower = file_path.lower()
+        is_example_path = _EXAMPLE_PATH.search(path_lower) is not None
+        is_production_path = _PRODUCTION_PATH.search(path_lower) is not None
+        
+        for pattern_info in self._candidate_patterns(content):
             try:
                 for match in pattern_info["regex"].finditer(content):
                     # Check for false positives
@@ -213,23 +385,20 @@ class SecretScanner:
                     # Get the matched value
                     matched_value = match.group(1) if match.lastindex else match.group(0)
                     
-                    # Calculate line number
-                    line_start = content[:match.start()].count('\n') + 1
-                    
-                    # Calculate column
-                    line_start_pos = content.rfind('\n', 0, match.start()) + 1
-                    column_start = match.start() - line_start_pos
+                    # Calculate line number and column by bisecting the line
+                    # offsets rather than rescanning the content per match
+                    line_index = lines.line_index(match.start())
+                    line_start = line_index + 1
+                    column_start = match.start() - lines.starts[line_index]
                     column_end = column_start + len(matched_value)
                     
-                    # Check if test file
-                    is_test = self._is_test_file(file_path)
-                    
                     # Calculate risk score
                     risk_score = self._calculate_risk_score(
                         pattern_info["severity"],
                         pattern_info["confidence"],
                         is_test,
-                        file_path
+                        is_example_path,
+                        is_production_path
                     )
                     
                     # Calculate entropy for additional context
@@ -265,7 +434,7 @@ class SecretScanner:
         self,
         content: str,
         file_path: str,
-        lines: List[str]
+        lines: _LineView
     ) -> List[Finding]:
         """Scan content using entropy analysis"""
         findings = []
@@ -274,9 +443,9 @@ class SecretScanner:
             return findings
         
         entropy_findings = analyze_file_entropy(content)
+        is_test = self._is_test_file(file_path)
         
         for ef in entropy_findings:
-            is_test = self._is_test_file(file_path)
             risk_level, risk_score = calculate_risk_from_entropy(
                 ef.entropy,
                 ef.char_set
@@ -332,7 +501,7 @@ class SecretScanner:
             if not content.strip():
                 return findings
             
-            lines = content.split('\n')
+            lines = _LineView(content)
             str_path = str(file_path)
             
             # Pattern-based scanning
@@ -363,7 +532,6 @@ class SecretScanner:
         scan_id = str(uuid.uuid4())
         started_at = datetime.utcnow()
         all_findings = []
-        files_scanned = 0
         errors = []
         
         logger.info(f"Starting scan of directory: {directory}")
@@ -387,44 +555,51 @@ class SecretScanner:
         
         logger.info(f"Found {len(files_to_scan)} files to scan")
         
-        # Scan files in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_file = {
-                executor.submit(self.scan_file, file_path): file_path
-                for file_path in files_to_scan
-            }
-            
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    findings = future.result()
-                    all_findings.extend(findings)
-                    files_scanned += 1
-                except Exception as e:
-                    errors.append(f"Error scanning {file_path}: {e}")
-                    logger.error(f"Error scanning {file_path}: {e}")
+        # Scan files in parallel. Regex, entropy and hashing hold the GIL, so
+        # large trees go to worker processes when there are CPUs to run them;
+        # daemonic processes (Celery prefork workers) cannot start children
+        # and stay on threads
+        process_workers = min(self.max_workers, os.cpu_count() or 1)
+        if (
+            self.executor == "process"
+            and process_workers > 1
+            and len(files_to_scan) >= PROCESS_POOL_MIN_FILES
+            and not multiprocessing.current_process().daemon
+        ):
+            files_scanned = self._scan_files_in_processes(files_to_scan, process_workers, all_findings, errors)
+        else:
+            files_scanned = self._scan_files_in_threads(files_to_scan, all_findings, errors)
         
         completed_at = datetime.utcnow()
         duration = (completed_at - started_at).total_seconds()
         
-        # Deduplicate findings by hash
+        # Memoized values are secrets; do not keep them past the scan
+        clear_value_caches()
+        _sha256_hex.cache_clear()
+        
+        # Deduplicate findings by hash, counting by severity and summing
+        # risk scores in the same pass
         seen_hashes = set()
         unique_findings = []
+        high_count = medium_count = low_count = 0
+        risk_total = 0.0
         for finding in all_findings:
-            if finding.secret_hash not in seen_hashes:
-                seen_hashes.add(finding.secret_hash)
-                unique_findings.append(finding)
-        
-        # Count by severity
-        high_count = sum(1 for f in unique_findings if f.severity in ['critical', 'high'])
-        medium_count = sum(1 for f in unique_findings if f.severity == 'medium')
-        low_count = sum(1 for f in unique_findings if f.severity == 'low')
+            if finding.secret_hash in seen_hashes:
+                continue
+            seen_hashes.add(finding.secret_hash)
+            unique_findings.append(finding)
+            
+            severity = finding.severity
+            if severity == 'critical' or severity == 'high':
+                high_count += 1
+            elif severity == 'medium':
+                medium_count += 1
+            elif severity == 'low':
+                low_count += 1
+            risk_total += finding.risk_score
         
         # Calculate overall risk score
-        if unique_findings:
-            risk_score = sum(f.risk_score for f in unique_findings) / len(unique_findings)
-        else:
-            risk_score = 0.0
+        risk_score = risk_total / len(unique_findings) if unique_findings else 0.0
         
         result = ScanResult(
             scan_id=scan_id,
@@ -451,6 +626,66 @@ class SecretScanner:
         
         return result
     
+    def _scan_files_in_threads(
+        self,
+        files_to_scan: List[Path],
+        all_findings: List[Finding],
+        errors: List[str]
+    ) -> int:
+        """Scan files on a thread pool; returns the number scanned"""
+        files_scanned = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_file = {
+                executor.submit(self.scan_file, file_path): file_path
+                for file_path in files_to_scan
+            }
+            
+            for future in as_completed(future_to_file):
+                file_path = future_to_file[future]
+                try:
+                    findings = future.result()
+                    all_findings.extend(findings)
+                    files_scanned += 1
+                except Exception as e:
+                    errors.append(f"Error scanning {file_path}: {e}")
+                    logger.error(f"Error scanning {file_path}: {e}")
+        
+        return files_scanned
+    
+    def _scan_files_in_processes(
+        self,
+        files_to_scan: List[Path],
+        max_workers: int,
+        all_findings: List[Finding],
+        errors: List[str]
+    ) -> int:
+        """Scan files on a process pool; returns the number scanned"""
+        database = _get_pattern_database() if HYPERSCAN_AVAILABLE else None
+        scanner_options = {
+            "max_file_size": self.max_file_size,
+            "entropy_enabled": self.entropy_enabled,
+        }
+        # Files go out in chunks so IPC is paid per batch, not per file
+        chunksize = max(1, len(files_to_scan) // (max_workers * 8))
+        
+        files_scanned = 0
+        try:
+            # spawn, not fork: the API process runs other threads
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_scan_worker,
+                initargs=(scanner_options, hyperscan.dumpb(database) if database is not None else None)
+            ) as executor:
+                for findings in executor.map(_scan_file_worker, files_to_scan, chunksize=chunksize):
+                    all_findings.extend(findings)
+                    files_scanned += 1
+        except Exception as e:
+            errors.append(f"Error scanning files in worker processes: {e}")
+            logger.error(f"Error scanning files in worker processes: {e}")
+        
+        return files_scanned
+    
     async def scan_directory_async(
         self,
         directory: Path,
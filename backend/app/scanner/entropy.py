@@ -5,9 +5,12 @@ Detects high-entropy strings that may be secrets
 
 import math
 import re
+from functools import lru_cache
 from typing import List, Tuple, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class EntropyFinding:
@@ -33,6 +36,15 @@ ALPHANUMERIC_ENTROPY_THRESHOLD = 4.0
 # Minimum length for entropy analysis
 MIN_STRING_LENGTH = 20
 
+# Strings at least this long are counted with a NumPy byte histogram; below
+# it the per-call NumPy overhead costs more than the Python loop saves
+NUMPY_ENTROPY_MIN_LENGTH = 64
+
+# Memoized per candidate value: the same value is offered by several
+# STRING_PATTERNS on one line and recurs across files. The caches hold raw
+# candidate values, so scans clear them when they finish (clear_value_caches)
+VALUE_CACHE_SIZE = 65536
+
 # Patterns to find potential secrets (high-entropy strings in code)
 STRING_PATTERNS = [
     # Quoted strings
@@ -42,6 +54,14 @@ STRING_PATTERNS = [
     # Hex strings
     r'(?:0x)?([a-fA-F0-9]{32,})',
 ]
+COMPILED_STRING_PATTERNS = [re.compile(pattern) for pattern in STRING_PATTERNS]
+
+# Common non-secret shapes, as one alternation so a value is matched once:
+# all uppercase / all lowercase single word, all numbers, 32 hex chars
+# (might be the MD5 of test data), a repeated character or character pair
+NON_SECRET_PATTERN = re.compile(
+    r'^(?:[A-Z]+|[a-z]+|[0-9]+|[a-f0-9]{32}|(.)\1+|(..)+)$'
+)
 
 # Words to ignore (not secrets)
 IGNORE_WORDS = {
@@ -60,6 +80,7 @@ SKIP_EXTENSIONS = {
 }
 
 
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
 def calculate_shannon_entropy(data: str) -> float:
     """
     Calculate Shannon entropy of a string.
@@ -74,6 +95,12 @@ def calculate_shannon_entropy(data: str) -> float:
     if not data:
         return 0.0
     
+    # ASCII only, so byte counts are character counts
+    if len(data) >= NUMPY_ENTROPY_MIN_LENGTH and data.isascii():
+        counts = np.bincount(np.frombuffer(data.encode('ascii'), dtype=np.uint8))
+        probabilities = counts[counts > 0] / len(data)
+        return float(-(probabilities * np.log2(probabilities)).sum())
+    
     # Count character frequencies
     freq = {}
     for char in data:
@@ -90,6 +117,7 @@ def calculate_shannon_entropy(data: str) -> float:
     return entropy
 
 
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
 def detect_charset(data: str) -> str:
     """Detect the character set of a string"""
     data_set = set(data)
@@ -115,6 +143,7 @@ def get_entropy_threshold(charset: str) -> float:
     return thresholds.get(charset, ALPHANUMERIC_ENTROPY_THRESHOLD)
 
 
+@lru_cache(maxsize=VALUE_CACHE_SIZE)
 def is_likely_false_positive(value: str) -> bool:
     """Check if a high-entropy string is likely a false positive"""
     lower_value = value.lower()
@@ -132,20 +161,14 @@ def is_likely_false_positive(value: str) -> bool:
         return True
     
     # Check for common non-secret patterns
-    non_secret_patterns = [
-        r'^[A-Z]+$',  # All uppercase single word
-        r'^[a-z]+$',  # All lowercase single word
-        r'^[0-9]+$',  # All numbers
-        r'^[a-f0-9]{32}$',  # Might be MD5 hash of test data
-        r'^(.)\1+$',  # Repeating single character
-        r'^(..)+$',  # Repeating two-character pattern
-    ]
-    
-    for pattern in non_secret_patterns:
-        if re.match(pattern, value):
-            return True
-    
-    return False
+    return NON_SECRET_PATTERN.match(value) is not None
+
+
+def clear_value_caches() -> None:
+    """Drop memoized per-value results (and the secret values they hold)"""
+    calculate_shannon_entropy.cache_clear()
+    detect_charset.cache_clear()
+    is_likely_false_positive.cache_clear()
 
 
 def is_sequential(s: str) -> bool:
@@ -173,8 +196,8 @@ def analyze_line_entropy(
     findings = []
     
     # Find all potential secret strings in the line
-    for pattern in STRING_PATTERNS:
-        for match in re.finditer(pattern, line):
+    for pattern in COMPILED_STRING_PATTERNS:
+        for match in pattern.finditer(line):
             value = match.group(1) if match.lastindex else match.group(0)
             
             # Skip if too short
@@ -26,10 +26,12 @@ ml_exchange = Exchange('ml', type='direct')
 
 # Configure Celery
 celery_app.conf.update(
-    # Task settings
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    # Task settings (msgpack: smaller, faster broker payloads; json still
+    # accepted so messages queued before the switch can be consumed)
+    task_serializer='msgpack',
+    accept_content=['msgpack', 'json'],
+    result_serializer='msgpack',
+    result_accept_content=['msgpack', 'json'],
     timezone='UTC',
     enable_utc=True,
     
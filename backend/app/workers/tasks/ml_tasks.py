@@ -40,7 +40,7 @@ def retrain_model(
         if len(findings) < 50:
             logger.info("Not enough training data yet. Using synthetic data.")
             # Generate synthetic data for initial training
-            training_findings, labels = trainer.generate_synthetic_data(n_samples=1000)
+            X, y = trainer.generate_synthetic_matrix(n_samples=1000)
         else:
             # Convert to training format
             training_findings = []
@@ -63,20 +63,20 @@ def retrain_model(
                     labels.append(0)
                 else:  # RESOLVED = was a real secret
                     labels.append(1)
+            
+            X, y = trainer.prepare_training_data(training_findings, labels)
         
-        # Prepare and train
-        X, y = trainer.prepare_training_data(training_findings, labels)
-        
+        # Train
         results = trainer.train(
             X, y,
             validation_split=0.2,
             cross_validate=True,
-            hyperparameter_tuning=len(training_findings) > 500
+            hyperparameter_tuning=len(X) > 500
         )
         
         # Save model
         trainer.save_model(additional_metadata={
-            'training_samples': len(training_findings),
+            'training_samples': len(X),
             'retraining_reason': 'scheduled',
         })
         
@@ -90,7 +90,7 @@ def retrain_model(
         return {
             'status': 'success',
             'model_type': model_type,
-            'training_samples': len(training_findings),
+            'training_samples': len(X),
             'f1_score': results.get('f1_score'),
             'accuracy': results.get('accuracy'),
         }
@@ -116,11 +116,11 @@ def score_findings_batch(
     from app.core.database import SessionLocal
     from app.models.secret import Secret
     from app.ml.risk_scorer import get_risk_scorer
-    from app.ml.feature_extractor import FeatureExtractor
+    from app.ml.feature_extractor import get_feature_extractor
     
     db = SessionLocal()
     scorer = get_risk_scorer()
-    extractor = FeatureExtractor()
+    extractor = get_feature_extractor()
     
     try:
         findings = db.query(Secret).filter(Secret.id.in_(finding_ids)).all()
@@ -219,11 +219,11 @@ def calculate_business_impact(
     from app.core.database import SessionLocal
     from app.models.secret import Secret
     from app.ml.risk_scorer import get_risk_scorer
-    from app.ml.feature_extractor import FeatureExtractor
+    from app.ml.feature_extractor import get_feature_extractor
     
     db = SessionLocal()
     scorer = get_risk_scorer()
-    extractor = FeatureExtractor()
+    extractor = get_feature_extractor()
     
     try:
         finding = db.query(Secret).filter(Secret.id == finding_id).first()
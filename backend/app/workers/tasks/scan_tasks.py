@@ -44,7 +44,7 @@ def run_repository_scan(
     from app.models.secret import Secret
     from app.scanner.engine import SecretScanner
     from app.ml.risk_scorer import get_risk_scorer
-    from app.ml.feature_extractor import FeatureExtractor
+    from app.ml.feature_extractor import get_feature_extractor
     
     options = options or {}
     temp_dir = None
@@ -93,7 +93,7 @@ def run_repository_scan(
         # ML risk scoring
         self.update_state(state='PROGRESS', meta={'status': 'scoring', 'progress': 75})
         risk_scorer = get_risk_scorer()
-        feature_extractor = FeatureExtractor()
+        feature_extractor = get_feature_extractor()
         
         # Process findings
         findings_to_store = []
@@ -184,7 +184,7 @@ def run_quick_scan(
     """Quick scan of uploaded content without full repository clone"""
     from app.scanner.engine import SecretScanner
     from app.ml.risk_scorer import get_risk_scorer
-    from app.ml.feature_extractor import FeatureExtractor
+    from app.ml.feature_extractor import get_feature_extractor
     
     try:
         _update_scan_status(scan_id, 'running')
@@ -195,7 +195,7 @@ def run_quick_scan(
         
         # Score findings
         risk_scorer = get_risk_scorer()
-        feature_extractor = FeatureExtractor()
+        feature_extractor = get_feature_extractor()
         
         results = []
         for finding in findings:
@@ -514,34 +514,19 @@ def _store_findings(scan_id: int, findings: List[Dict]):
     
     # Fallback to local database
     from app.core.database import SessionLocal
-    from app.models.secret import Secret, SecretStatus
-    import hashlib
+    from app.models.secret import finding_rows, finding_upsert
+    
+    # One bulk INSERT for the whole scan, stored with the ML scores
+    rows = finding_rows(
+        [item['finding'] for item in findings],
+        scan_id,
+        scores=[(item['risk_level'], item['ml_score']) for item in findings]
+    )
     
     db = SessionLocal()
     try:
-        for item in findings:
-            finding = item['finding']
-            
-            secret = Secret(
-                finding_id=finding.finding_id,
-                scan_id=scan_id,
-                type=finding.type,
-                file_path=finding.file_path,
-                line_number=finding.line_number,
-                column_start=finding.column_start,
-                column_end=finding.column_end,
-                secret_value_masked=finding.secret_masked,
-                secret_hash=finding.secret_hash,
-                code_snippet=finding.code_snippet,
-                match_rule=finding.match_rule,
-                risk_level=item['risk_level'],
-                risk_score=item['ml_score'],
-                entropy_score=finding.entropy_score,
-                is_test_file=finding.is_test_file,
-                status=SecretStatus.OPEN.value,
-            )
-            db.add(secret)
-        
+        if rows:
+            db.execute(finding_upsert(), rows)
         db.commit()
     finally:
         db.close()
@@ -0,0 +1,68 @@
+"""Slack request signature verification tests."""
+
+import hashlib
+import hmac
+import sys
+import time
+
+import pytest
+sys.path.insert(0, '.')
+
+from app.integrations.slack_integration import SlackIntegration
+
+SIGNING_SECRET = 'test-signing-secret'
+BODY = b'token=abc&team_id=T1&command=%2Fscan'
+
+
+def _sign(timestamp: str, body: bytes = BODY) -> str:
+    base = b'v0:' + timestamp.encode('utf-8') + b':' + body
+    return 'v0=' + hmac.new(SIGNING_SECRET.encode(), base, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def slack():
+    return SlackIntegration(signing_secret=SIGNING_SECRET)
+
+
+def test_valid_signature(slack):
+    timestamp = str(int(time.time()))
+    assert slack.verify_signature(_sign(timestamp), timestamp, BODY)
+
+
+def test_stale_timestamp_rejected(slack):
+    timestamp = str(int(time.time()) - 600)
+    assert not slack.verify_signature(_sign(timestamp), timestamp, BODY)
+
+
+@pytest.mark.parametrize('timestamp', [
+    None,
+    1700000000,
+    '',
+    'abc',
+    '-1',
+    ' {now} ',
+    '{now_underscored}',
+    '{now_arabic_indic}',
+])
+def test_malformed_timestamp_rejected(slack, timestamp):
+    now = str(int(time.time()))
+    if isinstance(timestamp, str):
+        timestamp = timestamp.format(
+            now=now,
+            now_underscored=f'{now[:4]}_{now[4:]}',
+            now_arabic_indic=now.translate(str.maketrans('0123456789', '٠١٢٣٤٥٦٧٨٩')),
+        )
+    signature = _sign(timestamp) if isinstance(timestamp, str) else _sign(now)
+    assert slack.verify_signature(signature, timestamp, BODY) is False
+
+
+@pytest.mark.parametrize('signature', [None, b'v0=00', 42, '', 'v0=ü', 'v0=' + '0' * 64])
+def test_malformed_signature_rejected(slack, signature):
+    timestamp = str(int(time.time()))
+    assert slack.verify_signature(signature, timestamp, BODY) is False
+
+
+def test_unconfigured_secret_rejected(monkeypatch):
+    monkeypatch.delenv('SLACK_SIGNING_SECRET', raising=False)
+    timestamp = str(int(time.time()))
+    assert SlackIntegration().verify_signature(_sign(timestamp), timestamp, BODY) is False